@@ -0,0 +1,246 @@
+# analytics.py — vectorised (NumPy) stats over matches.json
+#
+#   python analytics.py winrate --by format --deck Mono-Green --since month
+#   python analytics.py cards --since 30d           # opponent cards vs. your win rate
+#   python analytics.py trend --window 10
+#   python analytics.py summary                     # short text, used by the Discord bot (!stats)
+#
+# Results: Win / Loss count as decided; anything else (Unknown, draws) is ignored for rates.
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+HISTORY_FILE = "matches.json"
+Z95 = 1.959963984540054
+
+class History:
+    """Column-oriented view of the match history: integer codes + lookup tables."""
+    def __init__(self, matches: List[dict]):
+        self.n = len(matches)
+        self.deck_names: List[str] = []
+        self.opp_names: List[str] = []
+        self.fmt_names: List[str] = []
+        self.arch_names: List[str] = []
+        self.card_names: List[str] = []
+        tables: Dict[str, Dict[str, int]] = {"deck": {}, "opp": {}, "fmt": {}, "arch": {}, "card": {}}
+        lists = {"deck": self.deck_names, "opp": self.opp_names, "fmt": self.fmt_names,
+                 "arch": self.arch_names, "card": self.card_names}
+
+        def code(kind: str, value) -> int:
+            v = str(value) if value else "??"
+            t = tables[kind]
+            c = t.get(v)
+            if c is None:
+                c = t[v] = len(lists[kind])
+                lists[kind].append(v)
+            return c
+
+        deck = np.empty(self.n, dtype=np.int32)
+        opp = np.empty(self.n, dtype=np.int32)
+        fmt = np.empty(self.n, dtype=np.int32)
+        arch = np.empty(self.n, dtype=np.int32)
+        result = np.full(self.n, -1, dtype=np.int8)
+        ts = np.zeros(self.n, dtype="datetime64[s]")
+        indptr = np.zeros(self.n + 1, dtype=np.int64)
+        indices: List[int] = []
+
+        for i, m in enumerate(matches):
+            deck[i] = code("deck", m.get("player_deck"))
+            opp[i] = code("opp", m.get("opponent"))
+            fmt[i] = code("fmt", m.get("format"))
+            arch[i] = code("arch", m.get("opponent_archetype"))
+            r = str(m.get("result") or "").lower()
+            result[i] = 1 if r == "win" else 0 if r == "loss" else -1
+            try:
+                ts[i] = np.datetime64(datetime.strptime(m.get("time") or "", "%Y-%m-%d %H:%M:%S"), "s")
+            except ValueError:
+                ts[i] = np.datetime64("NaT")
+            cards = {c for c in (m.get("opponent_deck") or []) if c and not str(c).startswith("Unknown(")}
+            indices.extend(code("card", c) for c in sorted(cards))
+            indptr[i + 1] = len(indices)
+
+        self.deck, self.opp, self.fmt, self.arch = deck, opp, fmt, arch
+        self.result, self.ts = result, ts
+        # sparse match × opponent-card presence matrix (CSR)
+        self.card_indptr = indptr
+        self.card_indices = np.asarray(indices, dtype=np.int32)
+
+    def column(self, by: str):
+        return {"deck": (self.deck, self.deck_names), "opponent": (self.opp, self.opp_names),
+                "format": (self.fmt, self.fmt_names), "archetype": (self.arch, self.arch_names)}[by]
+
+    def mask(self, deck: Optional[str] = None, fmt: Optional[str] = None, opponent: Optional[str] = None,
+             since: Optional[np.datetime64] = None, until: Optional[np.datetime64] = None) -> np.ndarray:
+        m = np.ones(self.n, dtype=bool)
+        for value, col, names in ((deck, self.deck, self.deck_names), (fmt, self.fmt, self.fmt_names),
+                                  (opponent, self.opp, self.opp_names)):
+            if value is not None:
+                m &= col == (names.index(value) if value in names else -1)
+        if since is not None:
+            m &= self.ts >= since
+        if until is not None:
+            m &= self.ts < until
+        return m
+
+def load(path: str = HISTORY_FILE) -> History:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = []
+    return History(data if isinstance(data, list) else [])
+
+def wilson(wins: np.ndarray, games: np.ndarray, z: float = Z95):
+    """95% Wilson score interval, elementwise. Rows with 0 games get (0, 1)."""
+    n = np.maximum(games, 1).astype(float)
+    p = wins / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    lo = np.where(games > 0, center - half, 0.0)
+    hi = np.where(games > 0, center + half, 1.0)
+    return lo, hi
+
+def winrates(h: History, by: str = "deck", mask: Optional[np.ndarray] = None) -> List[dict]:
+    col, names = h.column(by)
+    decided = h.result >= 0
+    if mask is not None:
+        decided &= mask
+    k = len(names)
+    games = np.bincount(col[decided], minlength=k)
+    wins = np.bincount(col[decided], weights=h.result[decided], minlength=k)
+    lo, hi = wilson(wins, games)
+    order = np.argsort(-games, kind="stable")
+    return [{"name": names[i], "games": int(games[i]), "wins": int(wins[i]),
+             "losses": int(games[i] - wins[i]), "winrate": float(wins[i] / games[i]),
+             "ci": (float(lo[i]), float(hi[i]))}
+            for i in order if games[i]]
+
+def card_deltas(h: History, mask: Optional[np.ndarray] = None, min_games: int = 3) -> List[dict]:
+    """
+    For every opponent card: your win rate in matches where it showed up vs. where it didn't.
+    Negative delta → the card correlates with your losses.
+    """
+    decided = h.result >= 0
+    if mask is not None:
+        decided &= mask
+    k = len(h.card_names)
+    if not k or not decided.any():
+        return []
+    rows = np.repeat(np.arange(h.n), np.diff(h.card_indptr))
+    keep = decided[rows]
+    cols, win = h.card_indices[keep], h.result[rows[keep]]
+    games_with = np.bincount(cols, minlength=k)
+    wins_with = np.bincount(cols, weights=win, minlength=k)
+
+    total_games = int(decided.sum())
+    total_wins = float(h.result[decided].sum())
+    games_without = total_games - games_with
+    wins_without = total_wins - wins_with
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wr_with = np.where(games_with > 0, wins_with / games_with, np.nan)
+        wr_without = np.where(games_without > 0, wins_without / games_without, np.nan)
+    delta = wr_with - wr_without
+    ok = (games_with >= min_games) & ~np.isnan(delta)
+    idx = np.flatnonzero(ok)
+    idx = idx[np.argsort(delta[idx], kind="stable")]
+    return [{"card": h.card_names[i], "games": int(games_with[i]), "winrate_with": float(wr_with[i]),
+             "winrate_without": float(wr_without[i]), "delta": float(delta[i])} for i in idx]
+
+def rolling(h: History, mask: Optional[np.ndarray] = None, window: int = 20) -> List[dict]:
+    """Rolling win rate over the last `window` decided matches, in time order."""
+    decided = h.result >= 0
+    if mask is not None:
+        decided &= mask
+    idx = np.flatnonzero(decided)
+    if not len(idx):
+        return []
+    idx = idx[np.argsort(h.ts[idx], kind="stable")]
+    res = h.result[idx].astype(float)
+    csum = np.concatenate(([0.0], np.cumsum(res)))
+    n = np.arange(1, len(res) + 1)
+    w = np.minimum(n, window)
+    rate = (csum[n] - csum[n - w]) / w
+    return [{"time": str(h.ts[j]), "winrate": float(r), "games": int(g)} for j, r, g in zip(idx, rate, w)]
+
+def parse_since(s: Optional[str]) -> Optional[np.datetime64]:
+    """Accepts "2025-09-01", "30d", "week" or "month" (calendar month to date)."""
+    if not s:
+        return None
+    now = datetime.now()
+    if s == "month":
+        return np.datetime64(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0), "s")
+    if s == "week":
+        start = now - timedelta(days=now.weekday())
+        return np.datetime64(start.replace(hour=0, minute=0, second=0, microsecond=0), "s")
+    if s.endswith("d") and s[:-1].isdigit():
+        return np.datetime64(now - timedelta(days=int(s[:-1])), "s")
+    try:
+        return np.datetime64(s, "s")
+    except ValueError:
+        raise ValueError(f'bad date {s!r}: use YYYY-MM-DD, "30d", "week" or "month"') from None
+
+def _pct(x: float) -> str:
+    return f"{x * 100:.0f}%"
+
+def format_winrates(rows: List[dict], limit: int = 10) -> str:
+    if not rows:
+        return "📭 No decided matches."
+    return "\n".join(f"{r['name']}: {_pct(r['winrate'])} ({r['wins']}-{r['losses']}, "
+                     f"95% CI {_pct(r['ci'][0])}–{_pct(r['ci'][1])})" for r in rows[:limit])
+
+def discord_summary(path: str = HISTORY_FILE, since: Optional[str] = None, fmt: Optional[str] = None) -> str:
+    """Short text block for the Discord bot."""
+    h = load(path)
+    m = h.mask(fmt=fmt, since=parse_since(since))
+    lines = ["📊 **Win rate by deck**", format_winrates(winrates(h, "deck", m), 5)]
+    worst = card_deltas(h, m)[:3]
+    if worst:
+        lines += ["", "☠️ **Opponent cards you lose to**"]
+        lines += [f"{c['card']}: {_pct(c['winrate_with'])} vs {_pct(c['winrate_without'])} ({c['games']} games)"
+                  for c in worst]
+    return "\n".join(lines)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Match history analytics")
+    ap.add_argument("cmd", choices=["winrate", "cards", "trend", "summary"])
+    ap.add_argument("--by", default="deck", choices=["deck", "format", "opponent", "archetype"])
+    ap.add_argument("--deck")
+    ap.add_argument("--format", dest="fmt")
+    ap.add_argument("--opponent")
+    ap.add_argument("--since", help='YYYY-MM-DD, "30d", "week" or "month"')
+    ap.add_argument("--min-games", type=int, default=3)
+    ap.add_argument("--window", type=int, default=20)
+    ap.add_argument("--limit", type=int, default=15)
+    ap.add_argument("--json", action="store_true")
+    ap.add_argument("--history", default=HISTORY_FILE)
+    a = ap.parse_args(argv)
+    try:
+        since = parse_since(a.since)
+    except ValueError as e:
+        ap.error(f"--since: {e}")
+
+    if a.cmd == "summary":
+        print(discord_summary(a.history, a.since, a.fmt))
+        return
+
+    h = load(a.history)
+    m = h.mask(a.deck, a.fmt, a.opponent, since)
+    if a.cmd == "winrate":
+        rows = winrates(h, a.by, m)
+        text = format_winrates(rows, a.limit)
+    elif a.cmd == "cards":
+        rows = card_deltas(h, m, a.min_games)[: a.limit]
+        text = "\n".join(f"{r['card']}: {_pct(r['winrate_with'])} with vs {_pct(r['winrate_without'])} "
+                         f"without ({r['delta'] * 100:+.0f} pts, {r['games']} games)" for r in rows) or "📭 Not enough data."
+    else:
+        rows = rolling(h, m, a.window)
+        text = "\n".join(f"{r['time']}  {_pct(r['winrate'])} (last {r['games']})" for r in rows[-a.limit:]) or "📭 No decided matches."
+    print(json.dumps(rows, ensure_ascii=False) if a.json else text)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
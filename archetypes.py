@@ -0,0 +1,161 @@
+# archetypes.py — live opponent archetype guesses from an inverted card → archetype index
+#
+# Reference lists come from matches.json (your own named decklists) and an optional
+# decklists.json corpus:
+#   {"Mono-Green": ["Llanowar Elves", ...]}  or  {"Mono-Green": [[4, "Llanowar Elves"], ...]}
+#
+#   python archetypes.py "Llanowar Elves" "Mossborn Hydra"   # offline check
+import json
+import math
+import os
+import sys
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+HISTORY_FILE = "matches.json"
+DECKLISTS_FILE = "decklists.json"
+POSTINGS_MAX = 64        # archetypes kept per card → bounded work per new card
+MIN_CARDS = 3            # don't guess from fewer opponent cards than this
+MIN_CONFIDENCE = 0.35    # cosine similarity needed before announcing
+
+def _card_names(entries) -> Set[str]:
+    out = set()
+    for it in entries or []:
+        if isinstance(it, str):
+            out.add(it)
+        elif isinstance(it, (list, tuple)) and len(it) == 2:
+            out.add(str(it[1]))
+    return {n for n in out if n and not n.startswith("Unknown(")}
+
+def _load_json(path: str):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def collect_reference_decks(history_path: str = HISTORY_FILE,
+                            decklists_path: str = DECKLISTS_FILE) -> Dict[str, Set[str]]:
+    decks: Dict[str, Set[str]] = {}
+    for m in _load_json(history_path) or []:
+        name = m.get("player_deck")
+        cards = _card_names(((m.get("player_decklist") or {}).get("main")))
+        if name and cards:
+            decks.setdefault(name, set()).update(cards)
+    corpus = _load_json(decklists_path) or {}
+    if isinstance(corpus, dict):
+        for name, entries in corpus.items():
+            cards = _card_names(entries)
+            if cards:
+                decks.setdefault(str(name), set()).update(cards)
+    return decks
+
+class ArchetypeIndex:
+    """
+    Inverted index card → [(archetype, weight)]. Both vectors are idf-weighted, so a posting
+    holds query weight × archetype weight = idf² / |archetype vector| and a running sum over
+    seen cards divided by |query| is the cosine similarity.
+    """
+    def __init__(self, decks: Dict[str, Set[str]], postings_max: int = POSTINGS_MAX):
+        self.names: List[str] = sorted(decks)
+        n = len(self.names)
+        df: Dict[str, int] = {}
+        for cards in decks.values():
+            for c in cards:
+                df[c] = df.get(c, 0) + 1
+        self.idf = {c: math.log(1 + n / k) for c, k in df.items()}
+
+        norms = [math.sqrt(sum(self.idf[c] ** 2 for c in decks[a])) or 1.0 for a in self.names]
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        for i, a in enumerate(self.names):
+            for c in decks[a]:
+                postings.setdefault(c, []).append((i, self.idf[c] ** 2 / norms[i]))
+        for c, plist in postings.items():
+            if len(plist) > postings_max:
+                plist.sort(key=lambda x: -x[1])
+                del plist[postings_max:]
+        self.postings = postings
+
+    def __len__(self):
+        return len(self.names)
+
+class ArchetypeTracker:
+    """Sparse running scores for one opponent; each new card touches ≤ POSTINGS_MAX entries."""
+    def __init__(self, index: ArchetypeIndex):
+        self.index = index
+        self.scores: Dict[int, float] = {}
+        self.seen: Set[str] = set()
+        self.q2 = 0.0          # |query|² over cards known to the index
+        self.known = 0
+        self.best: Optional[int] = None
+
+    def add(self, card: str) -> bool:
+        """Feeds one opponent card; True if it changed the leading archetype."""
+        if card in self.seen:
+            return False
+        self.seen.add(card)
+        plist = self.index.postings.get(card)
+        if not plist:
+            return False
+        idf = self.index.idf[card]
+        self.q2 += idf * idf
+        self.known += 1
+
+        # scores only grow, so only the archetypes touched here can take the lead
+        scores, before = self.scores, self.best
+        for a, w in plist:
+            s = scores.get(a, 0.0) + w
+            scores[a] = s
+            if self.best is None or s > scores[self.best]:
+                self.best = a
+        return self.best != before
+
+    def guess(self) -> Optional[Tuple[str, float]]:
+        """(archetype, cosine similarity) or None."""
+        if self.best is None or self.q2 <= 0:
+            return None
+        return self.index.names[self.best], self.scores[self.best] / math.sqrt(self.q2)
+
+    def confident_guess(self) -> Optional[Tuple[str, float]]:
+        g = self.guess()
+        if g and self.known >= MIN_CARDS and g[1] >= MIN_CONFIDENCE:
+            return g
+        return None
+
+_cache: Optional[Tuple[tuple, ArchetypeIndex]] = None   # (key, index), swapped as one object
+
+def _mtime(path: str):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def load_index(history_path: str = HISTORY_FILE, decklists_path: str = DECKLISTS_FILE) -> ArchetypeIndex:
+    """
+    Built once, rebuilt only when matches.json / decklists.json change. Re-reads the whole
+    history, so the watcher runs it on the prefetch thread at deck submission.
+    """
+    global _cache
+    key = (history_path, _mtime(history_path), decklists_path, _mtime(decklists_path))
+    cached = _cache
+    if cached is None or cached[0] != key:
+        cached = _cache = (key, ArchetypeIndex(collect_reference_decks(history_path, decklists_path)))
+    return cached[1]
+
+def cached_index() -> Optional[ArchetypeIndex]:
+    """The last index load_index built, possibly stale; never touches the disk. None before the first build."""
+    cached = _cache
+    return cached[1] if cached is not None else None
+
+def classify(cards: Iterable[str], index: Optional[ArchetypeIndex] = None) -> Optional[Tuple[str, float]]:
+    t = ArchetypeTracker(index or load_index())
+    for c in cards:
+        t.add(c)
+    return t.guess()
+
+if __name__ == "__main__":
+    idx = load_index()
+    print(f"📚 {len(idx)} reference archetypes, {len(idx.postings)} distinct cards")
+    if len(sys.argv) > 1:
+        print(classify(sys.argv[1:], idx) or "❓ no match")
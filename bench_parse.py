@@ -0,0 +1,151 @@
+# bench_parse.py — throughput / memory benchmark for the log parsing pipeline
+#
+#   python bench_parse.py                  # run, compare against bench_baseline.json
+#   python bench_parse.py --rates          # also gate on throughput / RSS (same machine only)
+#   python bench_parse.py --save-baseline  # run and store the result as the new baseline
+#
+# By default only the machine-independent metrics (traced bytes and blocks per event) are
+# compared with the committed baseline; rates and RSS depend on the machine, so --rates
+# needs a baseline saved on the machine doing the comparison.
+#
+# Exit code 1 when any compared metric regresses beyond --tolerance.
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import synth_log
+
+BASELINE_FILE = "bench_baseline.json"
+
+# metric -> (bigger is better, comparable across machines)
+METRICS = {
+    "lines_per_s": (True, False),
+    "events_per_s": (True, False),
+    "peak_rss_mb": (False, False),
+    "peak_traced_bytes_per_event": (False, True),  # tracemalloc peak / events
+    "alloc_blocks_per_event": (False, True),       # blocks allocated by the run and alive at its end / events
+}
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def _fresh_watcher(history_path: str):
+    import mtga_log_watcher as w
+    w.HISTORY_FILE = history_path
+    w.WEBHOOK_URL = ""
+    w.reset_parser()
+    w._reset_session()
+    w.configure_sinks("stdout")
+    if os.path.exists(history_path):
+        os.remove(history_path)
+    return w
+
+def _run(lines, history_path: str) -> int:
+    w = _fresh_watcher(history_path)
+    events = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for line in lines:
+            for ev in w.feed_and_parse(line):
+                if isinstance(ev, dict):
+                    w.handle_top(ev)
+                    events += 1
+        if w.prefetcher is not None:
+            w.prefetcher.join()  # deck posts happen on the prefetch thread
+        w.bus.join()
+    return events
+
+def run_bench(matches: int, turns: int, repeat: int, seed: int) -> dict:
+    lines = list(synth_log.generate(matches=matches, turns=turns, seed=seed))
+    with tempfile.TemporaryDirectory() as tmp:
+        hist = os.path.join(tmp, "matches.json")
+        _run(lines[: len(lines) // 10 or 1], hist)  # warm-up (imports, card map)
+
+        best = None
+        events = 0
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            events = _run(lines, hist)
+            dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+
+        tracemalloc.start()
+        _run(lines, hist)
+        _, peak = tracemalloc.get_traced_memory()
+        # CPython keeps no running allocation count outside debug builds; what the traced run
+        # allocated and still holds (history, dedupe sets, caches) is the count we can pin
+        blocks = sum(st.count for st in tracemalloc.take_snapshot().statistics("filename"))
+        tracemalloc.stop()
+
+    return {
+        "lines": len(lines),
+        "events": events,
+        "lines_per_s": round(len(lines) / best, 1),
+        "events_per_s": round(events / best, 1),
+        "peak_rss_mb": _peak_rss_mb(),
+        "peak_traced_bytes_per_event": round(peak / max(events, 1), 1),
+        "alloc_blocks_per_event": round(blocks / max(events, 1), 2),
+    }
+
+def compare(result: dict, baseline: dict, tolerance: float, rates: bool = False) -> list:
+    """Returns human-readable regressions (empty list → OK); machine-dependent metrics only with `rates`."""
+    bad = []
+    for key, (higher_better, portable) in METRICS.items():
+        if not (portable or rates):
+            continue
+        cur, ref = result.get(key), baseline.get(key)
+        if cur is None or not ref:
+            continue
+        if higher_better and cur < ref * (1 - tolerance):
+            bad.append(f"{key}: {cur} < {ref} (-{(1 - cur / ref) * 100:.0f}%)")
+        if not higher_better and cur > ref * (1 + tolerance):
+            bad.append(f"{key}: {cur} > {ref} (+{(cur / ref - 1) * 100:.0f}%)")
+    return bad
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark feed_and_parse + handlers on a synthetic Player.log")
+    ap.add_argument("--matches", type=int, default=20)
+    ap.add_argument("--turns", type=int, default=16)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (0.2 = 20%%)")
+    ap.add_argument("--baseline", default=BASELINE_FILE)
+    ap.add_argument("--rates", action="store_true", help="also compare throughput and RSS (baseline from this machine)")
+    ap.add_argument("--save-baseline", action="store_true")
+    a = ap.parse_args()
+
+    result = run_bench(a.matches, a.turns, a.repeat, a.seed)
+    print("📊 " + json.dumps(result))
+
+    if a.save_baseline:
+        with open(a.baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 baseline written to {a.baseline}")
+        return
+
+    if not os.path.exists(a.baseline):
+        print(f"ℹ️ no {a.baseline} yet — run with --save-baseline to store one")
+        return
+    with open(a.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if (baseline.get("lines"), baseline.get("events")) != (result["lines"], result["events"]):
+        print("⚠️ baseline was recorded with a different workload; comparing rates only")
+    bad = compare(result, baseline, a.tolerance, a.rates)
+    if bad:
+        print("❌ regression:\n- " + "\n- ".join(bad))
+        sys.exit(1)
+    print("✅ no regression")
+
+if __name__ == "__main__":
+    main()
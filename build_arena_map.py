@@ -5,8 +5,10 @@ import zipfile
 import requests
 import os
 
+import scryfall_snapshot
+from card_index import compile_card_index
+
 MTGJSON_URL = "https://mtgjson.com/api/v5/AllPrintings.json.zip"
-SCRYFALL_BULK = "https://api.scryfall.com/bulk-data"
 CARD_DB = "card_map.json"
 MANUAL_OVERRIDES = "manual_overrides.json"
 
@@ -49,31 +51,18 @@ def fetch_from_mtgjson() -> dict:
 def merge_scryfall_default_cards(out: dict) -> int:
     print("🪄 also merging Scryfall default_cards bulk …")
     try:
-        meta = requests.get(SCRYFALL_BULK, timeout=30)
-        meta.raise_for_status()
-        items = meta.json().get("data", [])
-        default = next((i for i in items if i.get("type") == "default_cards"), None)
-        if not default:
-            print("⚠️ Could not find default_cards in bulk-data list")
-            return 0
-
-        bulk_url = default["download_uri"]
-        r = requests.get(bulk_url, timeout=180)
-        r.raise_for_status()
-        blob = r.json()
+        scryfall_snapshot.download_default_cards()
+        scryfall_snapshot.build_snapshot()
     except Exception as e:
         print(f"⚠️ Scryfall bulk failed, skipping merge: {e}")
         return 0
+    print(f"📦 kept {scryfall_snapshot.SNAPSHOT_JSON}, offline index in {scryfall_snapshot.SNAPSHOT_INDEX}")
 
     added = 0
-    for c in blob:
-        aid = c.get("arena_id")
-        name = c.get("name")
-        if aid and name:
-            k = str(aid)
-            if k not in out:
-                out[k] = name
-                added += 1
+    for k, name in scryfall_snapshot.items():
+        if k not in out:
+            out[k] = name
+            added += 1
     print(f"✅ merged +{added} from Scryfall default_cards")
     return added
 
@@ -101,6 +90,8 @@ def main():
     print(f"💾 writing {CARD_DB} ({len(out)} entries)")
     with open(CARD_DB, "w", encoding="utf-8") as f:
         json.dump(out, f, indent=2, ensure_ascii=False)
+    gen = compile_card_index(out)
+    print(f"🗂️ compiled card index (generation {gen})")
     print("✅ done")
 
 if __name__ == "__main__":
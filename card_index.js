@@ -0,0 +1,72 @@
+// card_index.js — leitor Node do índice compilado card_map.idx (layout em card_index.py)
+const fs = require('fs');
+
+const MAGIC = 'NTCI';
+const VERSION = 1;
+const HEADER_SIZE = 32;
+const RECORD_SIZE = 12;
+
+function openCardIndex(path = 'card_map.idx', checkEveryMs = 1000) {
+  let buf = null;
+  let count = 0;
+  let strOff = 0;
+  let generation = 0;
+  let stamp = null;
+  let nextCheck = 0;
+
+  function load() {
+    const st = fs.statSync(path);
+    const b = fs.readFileSync(path);
+    if (b.length < HEADER_SIZE || b.toString('latin1', 0, 4) !== MAGIC || b.readUInt16LE(4) !== VERSION) {
+      throw new Error(`${path}: not a card index (v${VERSION})`);
+    }
+    buf = b;
+    generation = b.readUInt32LE(8);
+    count = b.readUInt32LE(12);
+    strOff = b.readUInt32LE(20);
+    stamp = `${st.mtimeMs}:${st.size}:${st.ino}`;
+  }
+
+  function maybeReload() {
+    const now = Date.now();
+    if (now < nextCheck) return false;
+    nextCheck = now + checkEveryMs;
+    try {
+      const st = fs.statSync(path);
+      if (`${st.mtimeMs}:${st.size}:${st.ino}` === stamp) return false;
+      load();
+      return true;
+    } catch {
+      return false;
+    }
+  }
+
+  function get(grpId) {
+    maybeReload();
+    const id = Number(grpId);
+    if (!buf || !Number.isInteger(id)) return null;
+    let lo = 0, hi = count - 1;
+    while (lo <= hi) {
+      const mid = (lo + hi) >>> 1;
+      const at = HEADER_SIZE + mid * RECORD_SIZE;
+      const key = buf.readUInt32LE(at);
+      if (key < id) lo = mid + 1;
+      else if (key > id) hi = mid - 1;
+      else {
+        const start = strOff + buf.readUInt32LE(at + 4);
+        return buf.toString('utf8', start, start + buf.readUInt32LE(at + 8));
+      }
+    }
+    return null;
+  }
+
+  load();
+  return {
+    get,
+    maybeReload,
+    get generation() { return generation; },
+    get size() { return count; },
+  };
+}
+
+module.exports = { openCardIndex };
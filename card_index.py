@@ -0,0 +1,265 @@
+# card_index.py — compiled grpId → name index shared by all readers
+#
+# File layout (little-endian), "card_map.idx":
+#
+#   header, 32 bytes
+#     0  4s  magic       b"NTCI"
+#     4  H   version     1
+#     6  H   reserved    0
+#     8  I   generation  bumped on every compile (readers hot-reload on change)
+#    12  I   count       number of records
+#    16  I   rec_off     offset of the record table (32)
+#    20  I   str_off     offset of the string blob
+#    24  I   str_len     size of the string blob
+#    28  I   reserved    0
+#   records, count × 12 bytes, sorted by grp_id
+#     I grp_id, I name_off (relative to str_off), I name_len
+#   strings, UTF-8 names back to back
+#
+# Readers: CardIndex (Python) and card_index.js (Node) both read the whole file into memory and
+# binary-search it there. Neither keeps the file open or mapped, so a writer can always
+# os.replace() it — on Windows a mapped file can't be replaced, which would freeze hot reload.
+import json
+import os
+import struct
+import threading
+import time
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, Optional, Tuple
+
+CARD_INDEX = "card_map.idx"
+MAGIC = b"NTCI"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIIIII")
+RECORD = struct.Struct("<III")
+
+def read_generation(path: str = CARD_INDEX) -> int:
+    try:
+        with open(path, "rb") as f:
+            head = f.read(HEADER.size)
+        magic, version, _, gen, *_ = HEADER.unpack(head)
+        if magic == MAGIC and version == VERSION:
+            return gen
+    except (OSError, struct.error):
+        pass
+    return 0
+
+def compile_card_index(card_map: Dict[str, str], path: str = CARD_INDEX, retries: int = 5) -> int:
+    """
+    Writes `card_map` as a compiled index (atomic replace) and returns the new generation.
+    Non-numeric keys and empty names are skipped.
+    """
+    items = sorted((int(k), str(v)) for k, v in card_map.items() if str(k).isdigit() and v)
+    blob = bytearray()
+    table = bytearray()
+    for gid, name in items:
+        raw = name.encode("utf-8")
+        table += RECORD.pack(gid, len(blob), len(raw))
+        blob += raw
+
+    gen = read_generation(path) + 1
+    str_off = HEADER.size + len(table)
+    head = HEADER.pack(MAGIC, VERSION, 0, gen, len(items), HEADER.size, str_off, len(blob), 0)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(head)
+        f.write(table)
+        f.write(blob)
+    for attempt in range(retries):
+        try:
+            os.replace(tmp, path)
+            return gen
+        except PermissionError:
+            # Windows: a reader is in the middle of its (short) read of the old file
+            time.sleep(0.01 * (attempt + 1))
+    print(f"⚠️ could not replace {path} (in use); readers keep generation {gen - 1}")
+    return gen - 1
+
+class CardIndex:
+    """
+    Read-only view over a compiled index. Lookups are a binary search on the file's bytes;
+    nothing is parsed up front. The file is re-checked at most every `check_every`
+    seconds and re-read when a newer generation was written.
+
+    Safe to share between threads (the watcher and prefetch.py): a reload swaps in one
+    immutable (buf, count, str_off) tuple and every lookup reads that tuple exactly once.
+    """
+    _EMPTY = (b"", 0, 0)
+
+    def __init__(self, path: str = CARD_INDEX, check_every: float = 1.0):
+        self.path = path
+        self.check_every = check_every
+        self.generation = 0
+        self._state = self._EMPTY
+        self._stamp = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        self._open()
+
+    def _open(self):
+        with open(self.path, "rb") as f:
+            st = os.fstat(f.fileno())
+            buf = f.read()
+        if len(buf) < HEADER.size:
+            raise ValueError(f"{self.path}: truncated card index")
+        magic, version, _, gen, count, rec_off, str_off, _, _ = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION or rec_off != HEADER.size:
+            raise ValueError(f"{self.path}: not a card index (v{VERSION})")
+        self._state = (buf, count, str_off)
+        self.generation = gen
+        self._stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def maybe_reload(self) -> bool:
+        """Re-reads the file if it changed on disk. Returns True when a reload happened."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        if not self._reload_lock.acquire(blocking=False):
+            return False  # another thread is reloading; keep using the current state
+        try:
+            self._next_check = now + self.check_every
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return False
+            if (st.st_mtime_ns, st.st_size, st.st_ino) == self._stamp:
+                return False
+            try:
+                self._open()
+            except (OSError, ValueError):
+                return False
+            return True
+        finally:
+            self._reload_lock.release()
+
+    @staticmethod
+    def _name(buf: bytes, str_off: int, off: int, ln: int) -> str:
+        start = str_off + off
+        return buf[start:start + ln].decode("utf-8")
+
+    def get(self, grp_id, default: Optional[str] = None) -> Optional[str]:
+        self.maybe_reload()
+        try:
+            gid = int(grp_id)
+        except (TypeError, ValueError):
+            return default
+        buf, count, str_off = self._state
+        lo, hi = 0, count - 1
+        unpack, base, size = RECORD.unpack_from, HEADER.size, RECORD.size
+        while lo <= hi:
+            mid = (lo + hi) >> 1
+            key, off, ln = unpack(buf, base + mid * size)
+            if key < gid:
+                lo = mid + 1
+            elif key > gid:
+                hi = mid - 1
+            else:
+                return self._name(buf, str_off, off, ln)
+        return default
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        self.maybe_reload()
+        buf, count, str_off = self._state
+        for key, off, ln in RECORD.iter_unpack(buf[HEADER.size:HEADER.size + count * RECORD.size]):
+            yield str(key), self._name(buf, str_off, off, ln)
+
+    def __len__(self):
+        return self._state[1]
+
+    def close(self):
+        self._state = self._EMPTY
+
+_DELETED = object()
+
+class CardMap(MutableMapping):
+    """
+    dict-like card map: writes land in a small in-memory overlay,
+    reads fall through to the shared CardIndex. `dict(card_map)` materialises everything.
+    """
+    def __init__(self, index: CardIndex):
+        self.index = index
+        self._overlay = {}
+
+    def __getitem__(self, key) -> str:
+        k = str(key)
+        v = self._overlay.get(k)
+        if v is _DELETED:
+            raise KeyError(k)
+        if v is None:
+            v = self.index.get(k)
+            if v is None:
+                raise KeyError(k)
+        return v
+
+    def __setitem__(self, key, value):
+        self._overlay[str(key)] = str(value)
+
+    def __delitem__(self, key):
+        self[key]  # KeyError if absent
+        self._overlay[str(key)] = _DELETED
+
+    def __contains__(self, key) -> bool:
+        k = str(key)
+        v = self._overlay.get(k)
+        if v is not None:
+            return v is not _DELETED
+        return self.index.get(k) is not None
+
+    def __iter__(self):
+        for k, v in list(self._overlay.items()):
+            if v is not _DELETED:
+                yield k
+        for k, _ in self.index.items():
+            if k not in self._overlay:
+                yield k
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self) -> Dict[str, str]:
+        """Plain dict snapshot (one linear pass over the index, not one search per key)."""
+        out = dict(self.index.items())
+        for k, v in list(self._overlay.items()):  # the prefetch thread may be adding entries
+            if v is _DELETED:
+                out.pop(k, None)
+            else:
+                out[k] = v
+        return out
+
+def open_card_index(json_path: str, path: str = CARD_INDEX) -> Optional[CardIndex]:
+    """
+    Opens the compiled index, (re)building it from `json_path` when missing or older.
+    Returns None when neither exists.
+    """
+    try:
+        idx_mtime = os.path.getmtime(path)
+    except OSError:
+        idx_mtime = None
+    try:
+        json_mtime = os.path.getmtime(json_path)
+    except OSError:
+        json_mtime = None
+
+    if json_mtime is not None and (idx_mtime is None or json_mtime > idx_mtime):
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            compile_card_index(data, path)
+        except Exception as e:
+            print(f"⚠️ could not compile {path}: {e}")
+    if not os.path.exists(path):
+        return None
+    try:
+        return CardIndex(path)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ could not open {path}: {e}")
+        return None
+
+if __name__ == "__main__":
+    import sys
+    src = sys.argv[1] if len(sys.argv) > 1 else "card_map.json"
+    idx = open_card_index(src)
+    if idx is None:
+        raise SystemExit(f"❌ {src} not found")
+    print(f"✅ {CARD_INDEX}: {len(idx)} cards, generation {idx.generation}")
@@ -1,13 +1,57 @@
 # card_mapper.py
-import json, os, time, requests
-from typing import Iterable, Dict, Optional
+import json, os, threading, time
+from typing import Iterable, MutableMapping, Optional
+
+import scryfall_snapshot
+from card_index import CARD_INDEX, CardMap, compile_card_index, open_card_index
 
 CARD_DB = "card_map.json"
+SCRYFALL_RATE = 10.0   # requests/s, Scryfall's published limit
+# held while the card map is written, so the watcher and prefetch.py's thread don't interleave saves
+card_map_lock = threading.RLock()
+
+_session = None  # requests is ~80 ms to import; only pay for it when something goes to the network
+
+def _get_session():
+    global _session
+    if _session is None:
+        import requests
+        _session = requests.Session()
+        _session.headers.update({"User-Agent": "mtga-historian/1.0 (+discord-bot)"})
+    return _session
+
+class _RateLimiter:
+    def __init__(self, per_second: float):
+        self._next = 0.0
+        self._lock = threading.Lock()
+        self.set_rate(per_second)
+
+    def set_rate(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
 
-_session = requests.Session()
-_session.headers.update({"User-Agent": "mtga-historian/1.0 (+discord-bot)"})
+# one budget for the whole process: watcher, prefetch thread and repair workers all share it
+scryfall_limiter = _RateLimiter(SCRYFALL_RATE)
 
-def load_card_map() -> Dict[str, str]:
+def _scryfall_get(url: str, **kw):
+    scryfall_limiter.wait()
+    return _get_session().get(url, **kw)
+
+def load_card_map() -> MutableMapping[str, str]:
+    """
+    Card map backed by the shared compiled index (card_map.idx, hot-reloaded).
+    Falls back to parsing card_map.json into a dict if the index can't be built.
+    """
+    idx = open_card_index(CARD_DB, CARD_INDEX)
+    if idx is not None:
+        return CardMap(idx)
     if os.path.exists(CARD_DB):
         try:
             with open(CARD_DB, "r", encoding="utf-8") as f:
@@ -16,18 +60,63 @@ def load_card_map() -> Dict[str, str]:
             pass
     return {}
 
+class LazyCardMap(MutableMapping):
+    """load_card_map() deferred to the first lookup, so importing a script doesn't open the index."""
+    __slots__ = ("_map",)
+
+    def __init__(self):
+        self._map = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._map is not None
+
+    def _load(self) -> MutableMapping[str, str]:
+        with card_map_lock:
+            if self._map is None:
+                self._map = load_card_map()
+        return self._map
+
+    def __getitem__(self, key):
+        return (self._map if self._map is not None else self._load())[key]
+
+    def get(self, key, default=None):
+        return (self._map if self._map is not None else self._load()).get(key, default)
+
+    def __contains__(self, key):
+        return key in (self._map if self._map is not None else self._load())
+
+    def __setitem__(self, key, value):
+        self._load()[key] = value
+
+    def __delitem__(self, key):
+        del self._load()[key]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def copy(self):
+        return self._load().copy()
+
 def _save_atomic(path: str, data: dict):
     tmp = path + ".tmp"
     with open(tmp, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
     os.replace(tmp, path)
 
-def save_card_map(card_map: Dict[str, str]) -> None:
-    _save_atomic(CARD_DB, card_map)
+def save_card_map(card_map: MutableMapping[str, str]) -> None:
+    with card_map_lock:
+        data = card_map.copy()
+        _save_atomic(CARD_DB, data)
+        # other readers (watcher, repair scripts, Node bot) pick this up on their next lookup
+        compile_card_index(data, CARD_INDEX)
 
 def _fetch_from_scryfall(grp_id: int) -> Optional[str]:
     try:
-        r = _session.get(f"https://api.scryfall.com/cards/arena/{grp_id}", timeout=8)
+        r = _scryfall_get(f"https://api.scryfall.com/cards/arena/{grp_id}", timeout=8)
         if r.ok:
             js = r.json()
             n = js.get("name")
@@ -47,7 +136,7 @@ def _fetch_from_scryfall(grp_id: int) -> Optional[str]:
     }
     while True:
         try:
-            s = _session.get(url, params=params, timeout=12)
+            s = _scryfall_get(url, params=params, timeout=12)
         except Exception:
             break
         if not s.ok:
@@ -63,27 +152,33 @@ def _fetch_from_scryfall(grp_id: int) -> Optional[str]:
         break
     return None
 
-def get_card_name(grp_id, card_map: Dict[str, str], quiet: bool = False) -> str:
+def get_card_name(grp_id, card_map: MutableMapping[str, str], quiet: bool = False) -> str:
     key = str(grp_id)
     if key in card_map and card_map[key]:
         return card_map[key]
-    if not quiet:
-        print(f"🌐 resolving {key} ...")
-    name = _fetch_from_scryfall(int(grp_id))
+    # local Scryfall snapshot first; network only as a last resort
+    name = scryfall_snapshot.lookup(key)
+    if not name:
+        if not quiet:
+            print(f"🌐 resolving {key} ...")
+        name = _fetch_from_scryfall(int(grp_id))
     if name:
-        card_map[key] = name
-        save_card_map(card_map)
+        with card_map_lock:
+            card_map[key] = name
+            save_card_map(card_map)
         if not quiet:
             print(f"✅ {key} → {name}")
         return name
-    card_map[key] = f"Unknown({key})"
-    save_card_map(card_map)
+    with card_map_lock:
+        card_map[key] = f"Unknown({key})"
+        save_card_map(card_map)
     if not quiet:
         print(f"⚠️ not found {key}")
     return card_map[key]
 
-def resolve_many(grp_ids: Iterable[int], card_map: Dict[str, str], delay: float = 0.05) -> None:
+def resolve_many(grp_ids: Iterable[int], card_map: MutableMapping[str, str], delay: float = 0.05) -> None:
     seen = set()
+    fetched = False
     for gid in grp_ids:
         if gid is None: continue
         k = str(gid)
@@ -91,5 +186,8 @@ def resolve_many(grp_ids: Iterable[int], card_map: Dict[str, str], delay: float
         seen.add(k)
         if k not in card_map or not card_map[k] or card_map[k].startswith("Unknown("):
             _ = get_card_name(gid, card_map, quiet=True)
+            fetched = True
             if delay: time.sleep(delay)
-    save_card_map(card_map)
+    # rewriting card_map.json + the index is the expensive part; skip it when all were cached
+    if fetched:
+        save_card_map(card_map)
@@ -0,0 +1,363 @@
+# events.py — typed watcher events and the sinks that consume them
+#
+# Handlers in mtga_log_watcher publish dataclass events on a bus; every sink subscribes with a
+# filter, runs on its own thread and formats only the events it actually receives, so a slow
+# webhook never stalls parsing and an unused output costs nothing.
+#
+# SINKS (env), comma separated; empty = stdout, plus discord when WEBHOOK_URL is set:
+#   stdout
+#   discord                          WEBHOOK_URL, long texts split at DISCORD_CHUNK
+#   file:events.jsonl                one JSON object per event
+#   socket:127.0.0.1:9999            newline-delimited JSON over TCP
+# Filters go after "?":  discord?kinds=deck,hand,match_end   stdout?who=Opponent
+# A comma inside a filter belongs to it unless what follows names a sink:
+#   SINKS="stdout?kinds=deck,hand,file:events.jsonl"  → two sinks
+import json
+import queue
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import ClassVar, Dict, Iterable, List, Optional, Tuple
+
+# =======================
+# Events
+# =======================
+@dataclass(frozen=True)
+class Event:
+    kind: ClassVar[str] = "event"
+    ts: float = field(default_factory=time.time, kw_only=True)
+
+    def text(self) -> str:
+        return ""
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, **asdict(self)}
+
+@dataclass(frozen=True)
+class StateEvent(Event):
+    kind: ClassVar[str] = "state"
+    state: str
+
+    def text(self) -> str:
+        if self.state == "Playing":
+            return "🎮 You entered **Playing** — I’ll start reporting plays."
+        return ""
+
+@dataclass(frozen=True)
+class MatchStart(Event):
+    kind: ClassVar[str] = "match_start"
+    deck: str
+    fmt: Optional[str]
+
+    def text(self) -> str:
+        return f"🟢 New match: **{self.deck}** ({self.fmt or '??'})"
+
+@dataclass(frozen=True)
+class OpponentEvent(Event):
+    kind: ClassVar[str] = "opponent"
+    name: str
+
+    def text(self) -> str:
+        return f"👤 Opponent: **{self.name}**"
+
+@dataclass(frozen=True)
+class DeckEvent(Event):
+    kind: ClassVar[str] = "deck"
+    name: str
+    fmt: Optional[str]
+    main: List[Tuple[int, str]]
+    side: List[Tuple[int, str]]
+
+    def text(self) -> str:
+        lines = [f"🟢 **Deck:** {self.name} ({self.fmt or '??'})", "**Main**:"]
+        lines += [f"{q} {n}" for q, n in self.main]
+        if self.side:
+            lines += ["", "**Sideboard**:"] + [f"{q} {n}" for q, n in self.side]
+        return "\n".join(lines)
+
+@dataclass(frozen=True)
+class HandEvent(Event):
+    kind: ClassVar[str] = "hand"
+    cards: List[str]
+
+    def text(self) -> str:
+        return "\n".join(["✋ **Your opening hand**:"] + [f"- {n}" for n in self.cards])
+
+@dataclass(frozen=True)
+class DrawEvent(Event):
+    kind: ClassVar[str] = "draw"
+    who: str
+    card: str
+    grp_id: int
+    turn: Optional[int] = None
+
+    def text(self) -> str:
+        return f"📥 {self.who} drew: **{self.card}**"
+
+@dataclass(frozen=True)
+class PlayEvent(Event):
+    kind: ClassVar[str] = "play"
+    who: str
+    card: str
+    grp_id: int
+    zone: str
+    turn: Optional[int] = None
+
+    def text(self) -> str:
+        if self.zone == "stack":
+            return f"✨ {self.who} cast: **{self.card}** (stack)"
+        if self.zone == "battlefield":
+            return f"🃏 {self.who} played: **{self.card}** → battlefield"
+        return f"🃏 {self.who} moved: **{self.card}** → {self.zone}"
+
+@dataclass(frozen=True)
+class ArchetypeGuess(Event):
+    kind: ClassVar[str] = "archetype"
+    name: str
+    score: float
+    cards: int
+
+    def text(self) -> str:
+        return f"🔮 Opponent looks like: **{self.name}** ({self.score:.0%} match, {self.cards} cards)"
+
+@dataclass(frozen=True)
+class MatchEnd(Event):
+    kind: ClassVar[str] = "match_end"
+    match_id: Optional[str]
+    result: str
+    deck: Optional[str]
+    opponent: Optional[str]
+    turns: int = 0
+    life: Dict[str, int] = field(default_factory=dict)
+
+    def text(self) -> str:
+        game_line = ""
+        if self.turns:
+            life = " / ".join(f"{who} {hp}" for who, hp in self.life.items())
+            game_line = f"\n⏱️ Turns: {self.turns}" + (f" · ❤️ {life}" if life else "")
+        return (f"📜 **Match finished!**\n"
+                f"➡️ Result: **{self.result}**\n"
+                f"🃏 You: {self.deck or '??'}\n"
+                f"⚔️ Opponent: {self.opponent or '??'}"
+                f"{game_line}")
+
+# =======================
+# Sinks
+# =======================
+class Sink:
+    """Filtered consumer with its own queue + thread; drops events instead of blocking when full."""
+    QUEUE_MAX = 1000
+
+    def __init__(self, kinds: Optional[Iterable[str]] = None, who: Optional[str] = None):
+        self.kinds = set(kinds) if kinds else None
+        self.who = who
+        self.dropped = 0
+        self._q: "queue.Queue" = queue.Queue(self.QUEUE_MAX)
+        self._thread: Optional[threading.Thread] = None
+
+    def accepts(self, ev: Event) -> bool:
+        if self.kinds is not None and ev.kind not in self.kinds:
+            return False
+        return self.who is None or getattr(ev, "who", self.who) == self.who
+
+    def put(self, ev: Event):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+            self._thread.start()
+        try:
+            self._q.put_nowait(ev)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            ev = self._q.get()
+            try:
+                if ev is None:
+                    return
+                self.emit(ev)
+            except Exception as e:
+                self._report(e)
+            finally:
+                self._q.task_done()
+
+    def _report(self, e: Exception):
+        try:
+            print(f"⚠️ {type(self).__name__} error:", e)
+        except Exception:
+            pass  # stdout itself is gone (piped into head); keep draining so join() returns
+
+    def emit(self, ev: Event):
+        raise NotImplementedError
+
+    def join(self):
+        self._q.join()
+
+    def close(self):
+        if self._thread is not None:
+            self._q.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+class StdoutSink(Sink):
+    def emit(self, ev: Event):
+        text = ev.text()
+        if text:
+            print(text)
+
+class DiscordSink(Sink):
+    def __init__(self, url: str, chunk: int = 1800, **filters):
+        super().__init__(**filters)
+        self.url = url
+        self.chunk = chunk
+        self._session = None
+
+    def _post(self, text: str):
+        if self._session is None:
+            import requests  # deferred: most runs never post anything
+            self._session = requests.Session()
+        try:
+            self._session.post(self.url, json={"content": text}, timeout=6)
+        except Exception as e:
+            print("⚠️ Webhook error:", e)
+
+    def emit(self, ev: Event):
+        text = ev.text()
+        if not text:
+            return
+        buf = ""
+        for line in text.splitlines(True):
+            if buf and len(buf) + len(line) > self.chunk:
+                self._post(buf)
+                buf = ""
+            buf += line
+        if buf:
+            self._post(buf)
+
+class FileSink(Sink):
+    def __init__(self, path: str, **filters):
+        super().__init__(**filters)
+        self.path = path
+        self._f = None
+
+    def emit(self, ev: Event):
+        if self._f is None:
+            self._f = open(self.path, "a", encoding="utf-8")
+        self._f.write(json.dumps(ev.to_dict(), ensure_ascii=False) + "\n")
+        self._f.flush()
+
+    def close(self):
+        super().close()
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+class SocketSink(Sink):
+    """JSON lines to a TCP listener; (re)connects on the next event after a failure."""
+    def __init__(self, host: str, port: int, **filters):
+        super().__init__(**filters)
+        self.addr = (host, port)
+        self._sock = None
+
+    def emit(self, ev: Event):
+        data = (json.dumps(ev.to_dict(), ensure_ascii=False) + "\n").encode("utf-8")
+        try:
+            if self._sock is None:
+                import socket
+                self._sock = socket.create_connection(self.addr, timeout=3)
+            self._sock.sendall(data)
+        except OSError:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+            raise
+
+    def close(self):
+        super().close()
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+# =======================
+# Bus
+# =======================
+class EventBus:
+    def __init__(self, sinks: Iterable[Sink] = ()):
+        self.sinks: List[Sink] = []
+        self._all = False
+        self._kinds: set = set()
+        for s in sinks:
+            self.subscribe(s)
+
+    def subscribe(self, sink: Sink):
+        self.sinks.append(sink)
+        if sink.kinds is None:
+            self._all = True
+        else:
+            self._kinds |= sink.kinds
+
+    def wants(self, kind: str) -> bool:
+        """Cheap pre-check so handlers can skip building events nobody listens to."""
+        return self._all or kind in self._kinds
+
+    def publish(self, ev: Event):
+        for s in self.sinks:
+            if s.accepts(ev):
+                s.put(ev)
+
+    def join(self):
+        """Waits until every sink has handled what was published so far."""
+        for s in self.sinks:
+            s.join()
+
+    def close(self):
+        for s in self.sinks:
+            s.close()
+
+def make_sink(spec: str, webhook_url: str = "", discord_chunk: int = 1800) -> Sink:
+    """One SINKS entry, e.g. "file:events.jsonl?kinds=match_end"."""
+    spec, _, query = spec.strip().partition("?")
+    filters = {}
+    for part in filter(None, query.split("&")):
+        key, _, value = part.partition("=")
+        if key == "kinds":
+            filters["kinds"] = [k for k in value.split(",") if k]
+        elif key == "who":
+            filters["who"] = value
+        else:
+            raise ValueError(f"unknown sink filter {key!r}")
+    name, _, arg = spec.partition(":")
+    if name == "stdout":
+        return StdoutSink(**filters)
+    if name == "discord":
+        if not (arg or webhook_url):
+            raise ValueError("discord sink needs WEBHOOK_URL")
+        return DiscordSink(arg or webhook_url, discord_chunk, **filters)
+    if name == "file":
+        return FileSink(arg or "events.jsonl", **filters)
+    if name == "socket":
+        host, _, port = arg.rpartition(":")
+        return SocketSink(host or "127.0.0.1", int(port), **filters)
+    raise ValueError(f"unknown sink {name!r}")
+
+SINK_NAMES = ("stdout", "discord", "file", "socket")
+
+def _names_sink(part: str) -> bool:
+    name = part.strip().partition("?")[0].partition(":")[0]
+    return name in SINK_NAMES
+
+def split_specs(spec: str) -> List[str]:
+    """SINKS → one entry per sink; commas after a "?" continue its filter values (kinds=a,b)."""
+    specs: List[str] = []
+    for part in spec.split(","):
+        if specs and "?" in specs[-1] and not _names_sink(part):
+            specs[-1] += "," + part
+        elif part.strip():
+            specs.append(part.strip())
+    return specs
+
+def build_bus(spec: str = "", webhook_url: str = "", discord_chunk: int = 1800) -> EventBus:
+    specs = split_specs(spec)
+    if not specs:
+        specs = ["stdout"] + (["discord"] if webhook_url else [])
+    return EventBus(make_sink(s, webhook_url, discord_chunk) for s in specs)
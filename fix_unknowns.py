@@ -1,45 +1,19 @@
 # fix_unknowns.py
-import json, os, shutil
+import os
 import card_mapper
+import repair_engine
 
 # descobre o ficheiro de overrides
 OVR = getattr(card_mapper, "OVERRIDES", None) or getattr(card_mapper, "OVERRIDES_DB", "card_overrides.json")
-CARD_DB = getattr(card_mapper, "CARD_DB", "card_map.json")
 
 if not os.path.exists(OVR):
     raise SystemExit(f"❌ Overrides file not found: {OVR}")
 
-# carrega overrides e cache
-with open(OVR, "r", encoding="utf-8") as f:
-    over = {str(k): str(v) for k, v in json.load(f).items()}
-
-m = card_mapper.load_card_map()
-
-unknown_keys = [k for k, v in m.items() if str(v).startswith("Unknown(")]
-print(f"🔎 Unknown entries in cache before: {len(unknown_keys)}")
-
-changed = 0
-for k in unknown_keys:
-    if k in over and over[k]:
-        m[k] = over[k]
-        changed += 1
-
-print(f"✅ Replaced {changed} Unknown(...) entries using {OVR}")
-
-# tenta resolver os que ficaram Unknown via Scryfall
-left = [int(k) for k, v in m.items() if str(v).startswith("Unknown(")]
-if left:
-    print(f"🌐 Trying Scryfall for {len(left)} remaining Unknown IDs ...")
-    card_mapper.resolve_many(left, m, delay=0.08)
-    still = [k for k in left if str(m.get(str(k), "")).startswith("Unknown(")]
-    print(f"✅ After Scryfall: {len(left) - len(still)} fixed, {len(still)} still Unknown")
-
-# backup e grava
-if os.path.exists(CARD_DB):
-    shutil.copyfile(CARD_DB, CARD_DB + ".bak")
-card_mapper.save_card_map(m)
+# overrides → Scryfall (concorrente), uma só escrita no fim
+repair_engine.repair(card_map=True, history=False, overrides=OVR)
 
 # sanity: mostra alguns IDs conhecidos se existirem
+m = card_mapper.load_card_map()
 probe = ["96064", "96067", "96074"]
 present = {pid: m.get(pid) for pid in probe if pid in m}
 if present:
@@ -2,12 +2,23 @@
 require('dotenv').config();
 const { Client, GatewayIntentBits } = require('discord.js');
 const fs = require('fs');
+const { execFile } = require('child_process');
+const { openCardIndex } = require('./card_index');
 
 const client = new Client({
   intents: [GatewayIntentBits.Guilds, GatewayIntentBits.GuildMessages, GatewayIntentBits.MessageContent]
 });
 
 const HISTORY_FILE = 'matches.json';
+const CARD_INDEX_FILE = 'card_map.idx';
+const PYTHON = process.env.PYTHON || 'python';
+
+let cardIndex = null;
+function cardName(grpId) {
+  try { cardIndex = cardIndex || openCardIndex(CARD_INDEX_FILE); }
+  catch { return null; }
+  return cardIndex.get(grpId);
+}
 
 function loadHistory() {
   try { return JSON.parse(fs.readFileSync(HISTORY_FILE, 'utf8')); }
@@ -20,6 +31,25 @@ client.on('messageCreate', (message) => {
 
   if (m === '!ping') return message.reply('pong 🏓');
 
+  if (m.startsWith('!card ')) {
+    const id = m.slice(6).trim();
+    const name = cardName(id);
+    return message.reply(name ? `🃏 ${id} → **${name}**` : `❓ Carta ${id} não encontrada.`);
+  }
+
+  // !stats [since] [format] → analytics.py summary (ex.: !stats month Standard)
+  if (m === '!stats' || m.startsWith('!stats ')) {
+    const [since, fmt] = m.split(/\s+/).slice(1);
+    const args = ['analytics.py', 'summary'];
+    if (since) args.push('--since', since);
+    if (fmt) args.push('--format', fmt);
+    execFile(PYTHON, args, { timeout: 15000 }, (err, stdout) => {
+      if (err) return message.reply('⚠️ Não consegui calcular as estatísticas.');
+      message.reply(stdout.trim().slice(0, 1900) || '📭 Sem dados.');
+    });
+    return;
+  }
+
   if (m === '!history') {
     const history = loadHistory();
     if (!history.length) return message.reply('📭 Ainda não há partidas registadas.');
@@ -0,0 +1,289 @@
+# log_archive.py — compressed Player.log archives with random access (zstd seekable format)
+#
+# An archive is a run of independent zstd frames, each holding at most FRAME_SIZE bytes of log,
+# closed by a seek table in a skippable frame (same layout as zstd's contrib/seekable_format):
+#   u32 0x184D2A5E | u32 table size | per frame: u32 compressed, u32 decompressed [, u32 checksum]
+#   footer: u32 frame count, u8 descriptor (bit 7 = checksums), u32 0x8F92EAB1
+# Plain `zstd -d` still decompresses the whole thing (skippable frames are ignored).
+# Archives cut short (watcher killed before close) have no table; the reader then finds the
+# frames by walking them once, and `repair` truncates the torn tail and appends a table.
+#
+#   python log_archive.py pack   Player-prev.log [OUT.zst]
+#   python log_archive.py unpack ARCHIVE.zst [OUT]
+#   python log_archive.py info   ARCHIVE.zst
+#   python log_archive.py repair ARCHIVE.zst
+import argparse
+import bisect
+import io
+import os
+import struct
+import sys
+from typing import List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional: archiving is off without it (pip install zstandard)
+    zstandard = None
+
+FRAME_SIZE = 1 << 20        # decompressed bytes per frame = random access granularity
+LEVEL = 6
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+SKIPPABLE_MAGIC = 0x184D2A5E
+SEEKABLE_MAGIC = 0x8F92EAB1
+FOOTER = struct.Struct("<IBI")
+ENTRY = struct.Struct("<II")
+ENTRY_CHECKSUM = struct.Struct("<III")
+
+def _require():
+    if zstandard is None:
+        raise RuntimeError("zstandard is not installed (pip install zstandard)")
+
+def is_archive(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(4) == ZSTD_MAGIC
+    except OSError:
+        return False
+
+def _seek_table(frames: List[Tuple[int, int]]) -> bytes:
+    body = b"".join(ENTRY.pack(c, d) for c, d in frames) + FOOTER.pack(len(frames), 0, SEEKABLE_MAGIC)
+    return struct.pack("<II", SKIPPABLE_MAGIC, len(body)) + body
+
+class ArchiveWriter:
+    """Appends log data as fixed-size zstd frames; close() writes the seek table."""
+    def __init__(self, path: str, frame_size: int = FRAME_SIZE, level: int = LEVEL):
+        _require()
+        self.path = path
+        self.frame_size = frame_size
+        self.frames: List[Tuple[int, int]] = []
+        self._cctx = zstandard.ZstdCompressor(level=level)
+        self._buf = bytearray()
+        self._f = open(path, "wb")
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._buf += data
+        while len(self._buf) >= self.frame_size:
+            self._emit(self.frame_size)
+
+    def _emit(self, n: int):
+        block = bytes(self._buf[:n])
+        del self._buf[:n]
+        comp = self._cctx.compress(block)
+        self._f.write(comp)
+        self.frames.append((len(comp), len(block)))
+
+    def flush(self):
+        """Closes the current (short) frame so everything so far survives a crash."""
+        if self._buf:
+            self._emit(len(self._buf))
+        self._f.flush()
+
+    def close(self):
+        if self._f.closed:
+            return
+        self.flush()
+        self._f.write(_seek_table(self.frames))
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _read_seek_table(f, file_size: int) -> Optional[List[Tuple[int, int]]]:
+    if file_size < 8 + FOOTER.size:
+        return None
+    f.seek(file_size - FOOTER.size)
+    count, desc, magic = FOOTER.unpack(f.read(FOOTER.size))
+    if magic != SEEKABLE_MAGIC:
+        return None
+    entry = ENTRY_CHECKSUM if desc & 0x80 else ENTRY
+    body = count * entry.size + FOOTER.size
+    if file_size < body + 8:
+        return None
+    f.seek(file_size - body - 8)
+    skip_magic, size = struct.unpack("<II", f.read(8))
+    if skip_magic != SKIPPABLE_MAGIC or size != body:
+        return None
+    raw = f.read(count * entry.size)
+    return [e[:2] for e in entry.iter_unpack(raw)]
+
+def _walk_frames(f) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    Finds frames by decompressing them in order (archives without a seek table).
+    Returns the frames and the byte offset where the last complete one ends.
+    """
+    _require()
+    dctx = zstandard.ZstdDecompressor()
+    frames: List[Tuple[int, int]] = []
+    f.seek(0)
+    good = 0
+    pending = b""
+    while True:
+        if len(pending) < 8:
+            more = f.read(1 << 16)
+            if not more and not pending:
+                break
+            pending += more
+            if not more and len(pending) < 8:
+                break
+        magic = struct.unpack_from("<I", pending)[0]
+        if magic & 0xFFFFFFF0 == 0x184D2A50:  # skippable frame (an old seek table)
+            size = 8 + struct.unpack_from("<I", pending, 4)[0]
+            f.seek(good + size)
+            good += size
+            pending = b""
+            continue
+        obj = dctx.decompressobj()
+        csize = dsize = 0
+        try:
+            while True:
+                dsize += len(obj.decompress(pending))
+                if obj.eof:
+                    csize += len(pending) - len(obj.unused_data)
+                    pending = obj.unused_data
+                    break
+                csize += len(pending)
+                pending = f.read(1 << 16)
+                if not pending:
+                    return frames, good  # torn last frame
+        except zstandard.ZstdError:
+            return frames, good
+        frames.append((csize, dsize))
+        good += csize
+    return frames, good
+
+class ArchiveReader(io.RawIOBase):
+    """
+    Seekable raw reader over the decompressed log; only the frames touched are decompressed.
+    Wrap in io.BufferedReader (open_archive does) for readline()/iteration.
+    """
+    def __init__(self, path: str):
+        _require()
+        self._f = open(path, "rb")
+        file_size = os.fstat(self._f.fileno()).st_size
+        frames = _read_seek_table(self._f, file_size)
+        if frames is None:
+            frames, _ = _walk_frames(self._f)
+        self.frames = frames
+        self._cstart: List[int] = []
+        self._dstart: List[int] = []
+        c = d = 0
+        for csize, dsize in frames:
+            self._cstart.append(c)
+            self._dstart.append(d)
+            c += csize
+            d += dsize
+        self.length = d
+        self._pos = 0
+        self._dctx = zstandard.ZstdDecompressor()
+        self._cached = -1
+        self._block = b""
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            pos += self._pos
+        elif whence == io.SEEK_END:
+            pos += self.length
+        if pos < 0:
+            raise ValueError("negative seek position")
+        self._pos = pos
+        return pos
+
+    def _frame(self, i: int) -> bytes:
+        if i != self._cached:
+            csize, dsize = self.frames[i]
+            self._f.seek(self._cstart[i])
+            self._block = self._dctx.decompress(self._f.read(csize), max_output_size=dsize)
+            self._cached = i
+        return self._block
+
+    def readinto(self, b) -> int:
+        if self._pos >= self.length or not len(b):
+            return 0
+        i = bisect.bisect_right(self._dstart, self._pos) - 1
+        block = self._frame(i)
+        off = self._pos - self._dstart[i]
+        n = min(len(b), len(block) - off)
+        b[:n] = block[off:off + n]
+        self._pos += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._f.close()
+        super().close()
+
+def open_archive(path: str) -> io.BufferedReader:
+    """Binary file object over an archive — usable wherever open(log, "rb") is."""
+    return io.BufferedReader(ArchiveReader(path), buffer_size=1 << 16)
+
+def pack(src: str, dst: str, frame_size: int = FRAME_SIZE, level: int = LEVEL) -> List[Tuple[int, int]]:
+    with open(src, "rb") as f, ArchiveWriter(dst, frame_size, level) as w:
+        while True:
+            block = f.read(frame_size)
+            if not block:
+                break
+            w.write(block)
+    return w.frames
+
+def repair(path: str) -> int:
+    """Drops a torn trailing frame and (re)writes the seek table. Returns the frame count."""
+    with open(path, "r+b") as f:
+        if _read_seek_table(f, os.fstat(f.fileno()).st_size) is not None:
+            return -1
+        frames, good = _walk_frames(f)
+        f.truncate(good)
+        f.seek(good)
+        f.write(_seek_table(frames))
+    return len(frames)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="zstd seekable archives of Player.log")
+    ap.add_argument("cmd", choices=["pack", "unpack", "info", "repair"])
+    ap.add_argument("src")
+    ap.add_argument("dst", nargs="?")
+    ap.add_argument("--frame-size", type=int, default=FRAME_SIZE)
+    ap.add_argument("--level", type=int, default=LEVEL)
+    a = ap.parse_args(argv)
+
+    if a.cmd == "pack":
+        dst = a.dst or a.src + ".zst"
+        frames = pack(a.src, dst, a.frame_size, a.level)
+        print(f"✅ {a.src} → {dst}: {len(frames)} frames, "
+              f"{os.path.getsize(a.src)} → {os.path.getsize(dst)} bytes")
+    elif a.cmd == "unpack":
+        with open_archive(a.src) as f:
+            out = open(a.dst, "wb") if a.dst else sys.stdout.buffer
+            while True:
+                chunk = f.read(1 << 20)
+                if not chunk:
+                    break
+                out.write(chunk)
+            if a.dst:
+                out.close()
+    elif a.cmd == "info":
+        with open(a.src, "rb") as f:
+            table = _read_seek_table(f, os.fstat(f.fileno()).st_size)
+            frames = table if table is not None else _walk_frames(f)[0]
+        total = sum(d for _, d in frames)
+        print(f"📦 {a.src}: {len(frames)} frames, {total} bytes of log, "
+              f"{'seek table' if table is not None else 'no seek table (run repair)'}")
+    else:
+        n = repair(a.src)
+        print("✅ seek table already present" if n < 0 else f"🔧 {a.src}: seek table written for {n} frames")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# log_index.py — sidecar index over archived Player.log / Player-prev.log files
+#
+#   python log_index.py build  LOG [LOG ...]          # writes LOG.idx.json next to each log
+#   python log_index.py list   LOG [LOG ...]
+#   python log_index.py find   LOG [LOG ...] --opponent NAME | --match ID
+#   python log_index.py extract LOG MATCH_ID [OUT]     # raw bytes of one match
+#   python log_index.py replay  LOG MATCH_ID [--save]  # feed one match through the watcher handlers
+#
+# LOG may be a plain log or a zstd seekable archive written by the watcher / log_archive.py.
+# Offsets are byte offsets into the (decompressed) log: `start` is the deck submission that
+# preceded the match (or its first room event), `end` the end of its MatchCompleted state line.
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from typing import Iterator, List, Optional, Tuple
+
+import log_archive
+
+INDEX_VERSION = 3
+INDEX_SUFFIX = ".idx.json"
+
+MATCH_TO_RE = re.compile(rb"Match to (?P<uid>[A-Z0-9]+):")
+COMPLETED_RE = re.compile(rb"STATE CHANGED.*\"new\":\"MatchCompleted\"")
+
+def index_path(log_path: str) -> str:
+    return log_path + INDEX_SUFFIX
+
+def open_source(path: str):
+    """Binary, seekable reader for a raw log or a compressed archive (see log_archive.py)."""
+    if log_archive.is_archive(path):
+        return log_archive.open_archive(path)
+    return open(path, "rb")
+
+def iter_lines(f, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+    """(offset, raw line) pairs from `start` up to `end`."""
+    f.seek(start)
+    pos = start
+    while end is None or pos < end:
+        line = f.readline()
+        if not line:
+            break
+        yield pos, line
+        pos += len(line)
+
+def _deck_info(req) -> Optional[dict]:
+    if not isinstance(req, dict):
+        return None
+    summary = req.get("Summary") or {}
+    deck = req.get("Deck") or {}
+    if not (deck.get("MainDeck") or summary.get("Name")):
+        return None
+    fmt = next((a.get("value") for a in summary.get("Attributes") or [] if a.get("name") == "Format"), None)
+    return {"name": summary.get("Name"), "format": fmt}
+
+def scan(path: str) -> dict:
+    """One pass over the log; only JSON objects that can matter for the index are parsed."""
+    from mtga_log_watcher import JsonStream, _decode_request
+
+    parser = JsonStream()
+    matches: List[dict] = []
+    decks: List[dict] = []
+    my_uid = None
+    cur: Optional[dict] = None
+    last_deck: Optional[dict] = None
+    pending_deck: Optional[dict] = None   # submitted since the last match started
+    obj_start = 0
+
+    def close(end: int):
+        # players are resolved here: "Match to <uid>" (us) often shows up after the first room event
+        nonlocal cur
+        if cur is not None:
+            players, winner = cur.pop("_players"), cur.pop("_winner")
+            cur.pop("_final_end", None)
+            me = next((p for p in players if my_uid and p.get("userId") == my_uid), None)
+            opp = next((p for p in players if p is not me), None)
+            cur["opponent"] = (opp or {}).get("playerName")
+            if me and winner is not None:
+                cur["result"] = "Win" if winner == me.get("teamId") else "Loss"
+            cur["end"] = end
+            matches.append(cur)
+        cur = None
+
+    with open_source(path) as f:
+        for pos, raw in iter_lines(f):
+            nxt = pos + len(raw)
+            m = MATCH_TO_RE.search(raw)
+            if m:
+                my_uid = m.group("uid").decode("ascii", "ignore")
+            if COMPLETED_RE.search(raw) and cur is not None:
+                close(nxt)
+                continue
+            # GRE traffic is the bulk of the log and carries nothing the index needs
+            if parser.idle and b"greToClientEvent" in raw and raw.rstrip().endswith(b"}"):
+                continue
+            if parser.idle and b"{" not in raw:
+                continue
+
+            if parser.idle:
+                obj_start = pos  # a multi-line object completes on a later line
+            for obj in parser.feed(raw.decode("utf-8", "ignore"), []):
+                if not isinstance(obj, dict):
+                    continue
+                info = _deck_info(_decode_request(obj.get("request")))
+                if info:
+                    if cur is not None:
+                        # the MatchCompleted line (or the whole end) never came; like the watcher's
+                        # _close_stale_match, the next deck submission closes the match
+                        close(cur.get("_final_end", obj_start))
+                    last_deck = pending_deck = dict(info, offset=obj_start)
+                    decks.append(last_deck)
+                ev = obj.get("matchGameRoomStateChangedEvent")
+                if not isinstance(ev, dict):
+                    continue
+                room = ev.get("gameRoomInfo") or {}
+                cfg = room.get("gameRoomConfig") or {}
+                match_id = cfg.get("matchId") or ev.get("matchId")
+                if match_id and (cur is None or cur["match_id"] != match_id):
+                    close(pos)
+                    start = pending_deck["offset"] if pending_deck else pos
+                    pending_deck = None
+                    cur = {"match_id": match_id, "start": start, "end": None, "opponent": None,
+                           "deck": (last_deck or {}).get("name"), "format": (last_deck or {}).get("format"),
+                           "result": None, "_players": [], "_winner": None}
+                if cur is None:
+                    continue
+                cur["_players"] = cfg.get("reservedPlayers") or cur["_players"]
+                final = room.get("finalMatchResult") or ev.get("finalMatchResult")
+                if isinstance(final, dict):
+                    cur["_winner"] = next((r.get("winningTeamId") for r in final.get("resultList") or []
+                                           if r.get("scope") == "MatchScope_Match"), None)
+                    # keep going: the watcher finishes the match on the "MatchCompleted" state line
+                    cur["_final_end"] = nxt
+        length = f.tell()
+    if cur is not None:
+        close(length)
+    # size/mtime are the file's (compressed, for archives) and only validate the sidecar
+    return {"version": INDEX_VERSION, "log": os.path.basename(path), "size": os.path.getsize(path),
+            "mtime": os.path.getmtime(path), "length": length, "matches": matches, "decks": decks}
+
+def build(path: str) -> dict:
+    idx = scan(path)
+    tmp = index_path(path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(idx, f, ensure_ascii=False)
+    os.replace(tmp, index_path(path))
+    return idx
+
+def load(path: str, rebuild: bool = True) -> dict:
+    """Sidecar index for `path`, rebuilt if missing or the log changed since."""
+    try:
+        with open(index_path(path), "r", encoding="utf-8") as f:
+            idx = json.load(f)
+        if (idx.get("version") == INDEX_VERSION and idx.get("size") == os.path.getsize(path)
+                and idx.get("mtime") == os.path.getmtime(path)):
+            return idx
+    except (OSError, ValueError):
+        pass
+    if not rebuild:
+        raise FileNotFoundError(index_path(path))
+    return build(path)
+
+def find_match(path: str, match_id: str) -> Optional[dict]:
+    return next((m for m in load(path)["matches"] if m["match_id"] == match_id), None)
+
+def extract(path: str, match: dict) -> bytes:
+    with open_source(path) as f:
+        f.seek(match["start"])
+        return f.read(match["end"] - match["start"])
+
+def replay(path: str, match: dict, save: bool = False):
+    """Runs one archived match through feed_and_parse/handle_top, as if it were tailed live."""
+    import mtga_log_watcher as w
+    w.WEBHOOK_URL = ""
+    w.configure_sinks("stdout")
+    w.reset_parser()
+    w._reset_session()
+    tmp = None
+    if not save:
+        fd, tmp = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        os.remove(tmp)
+        w.HISTORY_FILE = tmp
+    try:
+        with open_source(path) as f:
+            for _, raw in iter_lines(f, match["start"], match["end"]):
+                for ev in w.feed_and_parse(raw.decode("utf-8", "ignore")):
+                    if isinstance(ev, dict):
+                        w.handle_top(ev)
+        if w.prefetcher is not None:
+            w.prefetcher.join()
+        w.bus.join()
+    finally:
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
+
+def _fmt(m: dict) -> str:
+    return (f"{m['match_id']}  {m.get('deck') or '??'} ({m.get('format') or '??'}) vs {m.get('opponent') or '??'}"
+            f"  → {m.get('result') or '??'}  [{m['start']}:{m['end']}]")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Index archived MTGA logs by match")
+    ap.add_argument("cmd", choices=["build", "list", "find", "extract", "replay"])
+    ap.add_argument("args", nargs="+")
+    ap.add_argument("--opponent")
+    ap.add_argument("--match")
+    ap.add_argument("--save", action="store_true", help="replay: append the match to matches.json")
+    a = ap.parse_args(argv)
+
+    if a.cmd in ("build", "list", "find"):
+        for log in a.args:
+            idx = build(log) if a.cmd == "build" else load(log)
+            if a.cmd == "build":
+                print(f"✅ {log}: {len(idx['matches'])} matches, {len(idx['decks'])} deck submissions")
+                continue
+            for m in idx["matches"]:
+                if a.match and m["match_id"] != a.match:
+                    continue
+                if a.opponent and (m.get("opponent") or "").lower() != a.opponent.lower():
+                    continue
+                print(f"{log}: {_fmt(m)}")
+        return
+
+    if len(a.args) < 2:
+        raise SystemExit(f"usage: log_index.py {a.cmd} LOG MATCH_ID")
+    log, match_id = a.args[0], a.args[1]
+    m = find_match(log, match_id)
+    if m is None:
+        raise SystemExit(f"❓ {match_id} not in {log}")
+    if a.cmd == "extract":
+        data = extract(log, m)
+        if len(a.args) > 2:
+            with open(a.args[2], "wb") as f:
+                f.write(data)
+            print(f"✅ wrote {len(data)} bytes to {a.args[2]}")
+        else:
+            sys.stdout.buffer.write(data)
+    else:
+        replay(log, m, a.save)
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,22 @@
 # mtga_log_watcher.py
+#
+#   python mtga_log_watcher.py           # tail Player.log
+#   python mtga_log_watcher.py --check   # time import/startup and exit (1 if over STARTUP_BUDGET_MS)
 import time
+_IMPORT_T0 = time.perf_counter()
 import json
 import os
 import re
+import sys
+from collections import OrderedDict
 from datetime import datetime
-import requests
 
-from card_mapper import load_card_map, get_card_name, resolve_many
+import events
+from card_mapper import LazyCardMap, get_card_name, resolve_many
+from events import (ArchetypeGuess, DeckEvent, DrawEvent, HandEvent, MatchEnd, MatchStart,
+                    OpponentEvent, PlayEvent, StateEvent)
+from prefetch import Prefetcher
+from play_log import PlayBuffer, TimelineBuffer, phase_code, summarize
 
 # =======================
 # Config
@@ -18,14 +28,25 @@ LOG_PATH = os.getenv(
 WEBHOOK_URL = os.getenv("WEBHOOK_URL", "").strip()
 HISTORY_FILE = "matches.json"
 DISCORD_CHUNK = 1800
+SINKS = os.getenv("SINKS", "").strip()   # event outputs, see events.py (default: stdout + discord if WEBHOOK_URL)
 INVERT_SEAT = os.getenv("INVERT_SEAT", "0") == "1"  # only use if you find seats flipped
 ANNOUNCE_PLAYS = os.getenv("ANNOUNCE_PLAYS", "1") == "1"
+DEDUPE_MAX = int(os.getenv("DEDUPE_MAX", "4096"))                     # remembered zone transfers
+SESSION_STALE_SECS = float(os.getenv("SESSION_STALE_SECS", "1800"))   # drop a match with no GRE traffic for this long
+ANNOUNCE_ARCHETYPE = os.getenv("ANNOUNCE_ARCHETYPE", "1") == "1"
+PREFETCH = os.getenv("PREFETCH", "1") == "1"       # resolve deck + likely opponent cards in the background
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "").strip()   # keep the tailed log as zstd seekable archives (log_archive.py)
 
 # =======================
 # State
 # =======================
-card_map = load_card_map()
+card_map = LazyCardMap()   # card_map.idx is opened on the first lookup, not at import
+prefetcher = Prefetcher(card_map) if PREFETCH else None
 opponent_cards = set()   # <— NOVO
+archetype_tracker = None  # ArchetypeTracker for the current opponent (lazy)
+announced_archetype = None
+archive = None            # log_archive.ArchiveWriter while ARCHIVE_DIR is set
+bus = events.build_bus(SINKS, WEBHOOK_URL, DISCORD_CHUNK)   # sink threads start on their first event
 
 
 current_match = {
@@ -35,17 +56,49 @@ current_match = {
     "opponent": None,
     "opponent_deck": None,
     "player_decklist": None,
-    "plays": [],
+    "plays": PlayBuffer(),   # packed play records, see play_log.py
+    "timeline": TimelineBuffer(),  # turns / phases / life / damage / counters / tokens
+    "life": {},              # seatId -> last seen life total
     "my_team_id": None,
     "my_seat": None,
     "opening_emitted": False,
     "finished": False,
+    "game": None,
+    "turn": None,
+    "phase": None,
 }
-_seen_play_instances = set()
-_seen_plays = set()
 instance_index = {}        # instanceId -> {grpId, controllerSeatId, ownerSeatId, zoneId, zone}
 zone_id_name = {}          # zoneId -> "hand"/"stack"/"battlefield"/...
 last_deck_sig = None
+_last_activity = time.monotonic()
+
+class TransferDedupe:
+    """
+    Remembers zone transfers already reported, keyed by
+    (game, turn, instanceId, src_zone, dst_zone).
+    Bounded LRU: the oldest keys fall off once `maxsize` is reached.
+    """
+    def __init__(self, maxsize: int = DEDUPE_MAX):
+        self.maxsize = maxsize
+        self._keys = OrderedDict()
+
+    def seen(self, key) -> bool:
+        """True if `key` was already recorded; otherwise records it."""
+        if key in self._keys:
+            self._keys.move_to_end(key)
+            return True
+        self._keys[key] = None
+        if len(self._keys) > self.maxsize:
+            self._keys.popitem(last=False)
+        return False
+
+    def clear(self):
+        self._keys.clear()
+
+    def __len__(self):
+        return len(self._keys)
+
+_seen_transfers = TransferDedupe()
 
 # =======================
 # Utils
@@ -53,32 +106,11 @@ last_deck_sig = None
 def ts_now():
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-def _post_webhook(text: str):
-    if not WEBHOOK_URL or not text:
-        return
-    try:
-        requests.post(WEBHOOK_URL, json={"content": text}, timeout=6)
-    except Exception as e:
-        print("⚠️ Webhook error:", e)
-
-def _announce(msg: str):
-    print(msg)
-    _post_webhook(msg)
-
-def _post_long(text: str):
-    if not text:
-        return
-    if not WEBHOOK_URL:
-        print(text)
-        return
-    buf = ""
-    for line in text.splitlines(True):
-        if len(buf) + len(line) > DISCORD_CHUNK:
-            _post_webhook(buf)
-            buf = ""
-        buf += line
-    if buf:
-        _post_webhook(buf)
+def configure_sinks(spec: str | None = None):
+    """(Re)builds the event bus from a SINKS-style spec; replay/bench use "stdout"."""
+    global bus
+    bus.close()
+    bus = events.build_bus(SINKS if spec is None else spec, WEBHOOK_URL, DISCORD_CHUNK)
 
 def load_history():
     if os.path.exists(HISTORY_FILE):
@@ -125,10 +157,6 @@ def follow(path):
 # =======================
 # Streaming JSON parser
 # =======================
-_buffer = []
-_open = 0
-_in_string = False
-_escaped = False
 MAX_CHUNK = 8_000_000
 
 STATE_RE    = re.compile(r"STATE CHANGED.*{\"old\":\"(?P<old>[^\"]+)\",\"new\":\"(?P<new>[^\"]+)\"}")
@@ -149,7 +177,68 @@ def _decode_request(val):
         break
     return v
 
-def feed_and_parse(line: str):
+class JsonStream:
+    """
+    Brace-counting JSON accumulator. One instance per log stream
+    (the watcher's own lives in _parser; the archive indexer uses another).
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.buffer = []
+        self.open = 0
+        self.in_string = False
+        self.escaped = False
+
+    @property
+    def idle(self) -> bool:
+        return self.open == 0
+
+    def feed(self, line: str, out: list) -> list:
+        buffer, depth, in_string, escaped = self.buffer, self.open, self.in_string, self.escaped
+        for c in line:
+            if depth == 0:
+                if c == "{":
+                    buffer = ["{"]; depth = 1
+                    in_string = False; escaped = False
+                else:
+                    continue
+            else:
+                buffer.append(c)
+                if escaped:
+                    escaped = False
+                elif c == "\\":
+                    escaped = True
+                elif c == '"':
+                    in_string = not in_string
+                elif not in_string:
+                    if c == "{":
+                        depth += 1
+                    elif c == "}":
+                        depth -= 1
+                        if depth == 0:
+                            raw = "".join(buffer)
+                            buffer = []
+                            try:
+                                obj = json.loads(raw)
+                                if isinstance(obj, dict) and "request" in obj:
+                                    obj["request"] = _decode_request(obj["request"])
+                                out.append(obj)
+                            except Exception:
+                                pass
+            if depth > 0 and len(buffer) > MAX_CHUNK:
+                # broken JSON; reset parser to avoid memory blowup
+                buffer = []; depth = 0; in_string = False; escaped = False
+        self.buffer, self.open, self.in_string, self.escaped = buffer, depth, in_string, escaped
+        return out
+
+_parser = JsonStream()
+
+def reset_parser():
+    _parser.reset()
+
+def feed_and_parse(line: str, parser: JsonStream | None = None):
     """
     - If it's a state change → pseudo-event {"_state": {old,new}}
     - If it has the "Match to <UID>:" header → {"_me_seen": True} (used to learn our seat later)
@@ -165,41 +254,7 @@ def feed_and_parse(line: str):
     if MATCH_TO_RE.search(line):
         out.append({"_me_seen": True})
 
-    global _buffer, _open, _in_string, _escaped
-    for c in line:
-        if _open == 0:
-            if c == "{":
-                _buffer = ["{"]; _open = 1
-                _in_string = False; _escaped = False
-            else:
-                continue
-        else:
-            _buffer.append(c)
-            if _escaped:
-                _escaped = False
-            elif c == "\\":
-                _escaped = True
-            elif c == '"':
-                _in_string = not _in_string
-            elif not _in_string:
-                if c == "{":
-                    _open += 1
-                elif c == "}":
-                    _open -= 1
-                    if _open == 0:
-                        raw = "".join(_buffer)
-                        _buffer = []
-                        try:
-                            obj = json.loads(raw)
-                            if isinstance(obj, dict) and "request" in obj:
-                                obj["request"] = _decode_request(obj["request"])
-                            out.append(obj)
-                        except Exception:
-                            pass
-        if _open > 0 and len(_buffer) > MAX_CHUNK:
-            # broken JSON; reset parser to avoid memory blowup
-            _buffer = []; _open = 0; _in_string = False; _escaped = False
-    return out
+    return (parser or _parser).feed(line, out)
 
 # =======================
 # Zone & object helpers
@@ -260,31 +315,55 @@ def _index_zones(zones):
 def _announce_play(instance_id, grp_id, seat, zone_name):
     if not ANNOUNCE_PLAYS:
         return
-    if instance_id in _seen_play_instances:
-        return
-    _seen_play_instances.add(instance_id)
 
     card_name = get_card_name(grp_id, card_map, quiet=True)
     who = _seat_label(seat)
     if who == "Opponent":   # <— NOVO
-        opponent_cards.add(card_name)
+        _note_opponent_card(card_name)
 
+    if bus.wants(PlayEvent.kind):
+        bus.publish(PlayEvent(who, card_name, grp_id, zone_name, current_match["turn"]))
 
-    sig = (int(grp_id), who, zone_name, len(current_match["plays"]))
-    if sig in _seen_plays:
-        return
-    _seen_plays.add(sig)
+    current_match["plays"].append(who, grp_id, zone_name, current_match["turn"], current_match["phase"])
 
-    if zone_name == "stack":
-        _announce(f"✨ {who} cast: **{card_name}** (stack)")
-    elif zone_name == "battlefield":
-        _announce(f"🃏 {who} played: **{card_name}** → battlefield")
+def _note_opponent_card(name: str):
+    global archetype_tracker, announced_archetype
+    if name in opponent_cards:
+        return
+    opponent_cards.add(name)
+    if not ANNOUNCE_ARCHETYPE:
+        return
+    if archetype_tracker is None:
+        import archetypes
+        index = archetypes.cached_index()  # built at deck submission; never rebuilt per card
+        if index is None:
+            if len(opponent_cards) == 1:  # joined mid-match: build it now, catch up on a later card
+                _warm_archetypes()
+            return
+        archetype_tracker = archetypes.ArchetypeTracker(index)
+        for seen in opponent_cards:
+            archetype_tracker.add(seen)
     else:
-        _announce(f"🃏 {who} moved: **{card_name}** → {zone_name}")
-
-    current_match["plays"].append({
-        "t": ts_now(), "who": who, "card": card_name, "zone": zone_name
-    })
+        archetype_tracker.add(name)
+    g = archetype_tracker.confident_guess()
+    if g and g[0] != announced_archetype:
+        announced_archetype = g[0]
+        bus.publish(ArchetypeGuess(g[0], g[1], archetype_tracker.known))
+
+def _warm_archetypes():
+    """(Re)builds the archetype index off the tail loop — matches.json changed with the last save."""
+    if not ANNOUNCE_ARCHETYPE:
+        return
+    import archetypes
+    def build():
+        try:
+            archetypes.load_index(HISTORY_FILE)
+        except Exception as e:
+            print("⚠️ Archetype index error:", e)
+    if prefetcher is not None:
+        prefetcher.submit_call(build)
+    else:
+        build()
 
 def _maybe_emit_opening_hand():
     if current_match["opening_emitted"]:
@@ -305,55 +384,126 @@ def _maybe_emit_opening_hand():
     names = [get_card_name(gid, card_map, quiet=True) for gid in hand_ids]
 
     current_match["opening_emitted"] = True
-    lines = ["✋ **Your opening hand**:"] + [f"- {n}" for n in names]
-    _post_long("\n".join(lines))
+    bus.publish(HandEvent(names))
+
+def _ann_details(ann: dict) -> dict:
+    dmap = {}
+    for d in ann.get("details", []):
+        k = d.get("key")
+        if not k: continue
+        if "valueInt32" in d and d["valueInt32"]:
+            dmap[k] = d["valueInt32"][0]
+        elif "valueString" in d and d["valueString"]:
+            dmap[k] = d["valueString"][0]
+    return dmap
+
+def _timeline(kind: str, who: str = "Player", ref=0, value=0, aux=0):
+    current_match["timeline"].append(kind, who, ref, value, aux,
+                                     current_match["turn"], current_match["phase"])
+
+def _on_zone_transfer(ann: dict, dmap: dict):
+    # Zone transfers carry draws / casts / battlefield entries
+    src = dmap.get("zone_src"); dst = dmap.get("zone_dest")
+    src_name = _simplify_zone(zone_id_name.get(src, ""))
+    dst_name = _simplify_zone(zone_id_name.get(dst, ""))
+
+    for inst in ann.get("affectedIds") or []:
+        rec = instance_index.get(inst, {})
+        grp = rec.get("grpId")
+        seat = rec.get("controllerSeatId") or rec.get("ownerSeatId")
+        if grp is None:
+            continue
+        # the same annotation is re-sent in diffs and reached twice by _walk
+        key = (current_match["game"], current_match["turn"], inst, src_name, dst_name)
+        if _seen_transfers.seen(key):
+            continue
+        who = _seat_label(seat)
+        if who == "Opponent":   # <— NOVO
+            _note_opponent_card(get_card_name(grp, card_map, quiet=True))
+        # draw: library → hand
+        if src_name == "library" and dst_name == "hand":
+            who = _seat_label(seat)
+            if bus.wants(DrawEvent.kind):
+                bus.publish(DrawEvent(who, get_card_name(grp, card_map, quiet=True), grp, current_match["turn"]))
+            current_match["plays"].append(who, grp, "draw", current_match["turn"], current_match["phase"])
+            continue
+        # cast: X → stack
+        if dst_name == "stack":
+            _announce_play(inst, grp, seat, "stack")
+            continue
+        # entered battlefield
+        if dst_name == "battlefield":
+            _announce_play(inst, grp, seat, "battlefield")
+            continue
+
+def _target_label(target_id) -> str:
+    # players show up in affectedIds by seat id, cards by instance id
+    rec = instance_index.get(target_id)
+    if rec is not None:
+        return _seat_label(rec.get("controllerSeatId") or rec.get("ownerSeatId"))
+    if target_id in (1, 2):
+        return _seat_label(target_id)
+    return "Player"
+
+def _on_damage(ann: dict, dmap: dict):
+    src = instance_index.get(ann.get("affectorId"), {})
+    for target in ann.get("affectedIds") or []:
+        _timeline("damage", _target_label(target), src.get("grpId") or 0, dmap.get("damage") or 0)
+
+def _on_counter(ann: dict, dmap: dict, sign: int):
+    amount = dmap.get("transaction_amount") or 1
+    for inst in ann.get("affectedIds") or []:
+        rec = instance_index.get(inst, {})
+        _timeline("counter", _target_label(inst), rec.get("grpId") or 0, sign * amount,
+                  dmap.get("counter_type") or 0)
+
+def _on_token(ann: dict, dmap: dict):
+    for inst in ann.get("affectedIds") or []:
+        rec = instance_index.get(inst, {})
+        _timeline("token", _target_label(inst), rec.get("grpId") or 0)
+
+def _on_object_id_changed(ann: dict, dmap: dict):
+    # cards get a new instanceId when they change zones; keep what we knew about them
+    old, new = dmap.get("orig_id"), dmap.get("new_id")
+    if old in instance_index and new is not None and new not in instance_index:
+        instance_index[new] = dict(instance_index[old])
+
+_ANNOTATION_HANDLERS = {
+    "ZoneTransfer": _on_zone_transfer,
+    "DamageDealt": _on_damage,
+    "CounterAdded": lambda ann, dmap: _on_counter(ann, dmap, 1),
+    "CounterRemoved": lambda ann, dmap: _on_counter(ann, dmap, -1),
+    "TokenCreated": _on_token,
+    "ObjectIdChanged": _on_object_id_changed,
+}
 
 def _handle_annotations(annotations):
     if not isinstance(annotations, list): return
     for ann in annotations:
-        types = ann.get("type") or []
-        # Zone transfers carry draws / casts / battlefield entries
-        if not any("ZoneTransfer" in t for t in types):
-            continue
-
-        # details -> dict
-        dmap = {}
-        for d in ann.get("details", []):
-            k = d.get("key")
-            if not k: continue
-            if "valueInt32" in d and d["valueInt32"]:
-                dmap[k] = d["valueInt32"][0]
-            elif "valueString" in d and d["valueString"]:
-                dmap[k] = d["valueString"][0]
-
-        src = dmap.get("zone_src"); dst = dmap.get("zone_dest")
-        src_name = _simplify_zone(zone_id_name.get(src, ""))
-        dst_name = _simplify_zone(zone_id_name.get(dst, ""))
-
-        for inst in ann.get("affectedIds") or []:
-            rec = instance_index.get(inst, {})
-            grp = rec.get("grpId")
-            seat = rec.get("controllerSeatId") or rec.get("ownerSeatId")
-            if grp is None:
-                continue
-            who = _seat_label(seat)
-            if who == "Opponent":   # <— NOVO
-                opponent_cards.add(get_card_name(grp, card_map, quiet=True))
-            # draw: library → hand
-            if src_name == "library" and dst_name == "hand":
-                who = _seat_label(seat)
-                name = get_card_name(grp, card_map, quiet=True)
-                _announce(f"📥 {who} drew: **{name}**")
-                current_match["plays"].append({"t": ts_now(), "who": who, "card": name, "zone": "draw"})
-                continue
-            # cast: X → stack
-            if dst_name == "stack":
-                _announce_play(inst, grp, seat, "stack")
-                continue
-            # entered battlefield
-            if dst_name == "battlefield":
-                _announce_play(inst, grp, seat, "battlefield")
+        if not isinstance(ann, dict): continue
+        for t in ann.get("type") or []:
+            handler = _ANNOTATION_HANDLERS.get(t[15:] if t.startswith("AnnotationType_") else t)
+            if handler is None:
                 continue
+            # zone transfers dedupe per card; the rest once per annotation id
+            if handler is not _on_zone_transfer and ann.get("id") is not None:
+                if _seen_transfers.seen(("ann", current_match["game"], ann.get("id"), t)):
+                    continue
+            handler(ann, _ann_details(ann))
+
+def _track_players(players):
+    """Life totals from the players block; a timeline entry on every change."""
+    if not isinstance(players, list): return
+    for p in players:
+        if not isinstance(p, dict): continue
+        seat = p.get("systemSeatNumber") or p.get("systemSeatId")
+        life = p.get("lifeTotal")
+        if seat is None or life is None:
+            continue
+        prev = current_match["life"].get(seat)
+        current_match["life"][seat] = life
+        if prev != life:
+            _timeline("life", _seat_label(seat), life - (life if prev is None else prev), life)
 
 # =======================
 # Decklist helpers
@@ -372,16 +522,6 @@ def _resolve_list(entries):
         agg[name] = agg.get(name, 0) + qty
     return sorted([(q, n) for n, q in agg.items()], key=lambda x: x[1].lower()), grp_ids
 
-def _format_decklist(deck_name, fmt, main, side):
-    lines = []
-    lines.append(f"🟢 **Deck:** {deck_name} ({fmt or '??'})")
-    lines.append("**Main**:")
-    for q, n in main: lines.append(f"{q} {n}")
-    if side:
-        lines.append(""); lines.append("**Sideboard**:")
-        for q, n in side: lines.append(f"{q} {n}")
-    return "\n".join(lines)
-
 def _deck_signature(summary: dict, deck: dict):
     name = (summary or {}).get("Name") or ""
     main = tuple(sorted(((int(x.get("cardId") or x.get("grpId")), int(x.get("quantity", 1)))
@@ -403,17 +543,29 @@ def _emit_decklist(summary: dict, deck: dict):
         if a.get("name") == "Format":
             fmt = a.get("value"); break
 
-    main, main_ids = _resolve_list((deck or {}).get("MainDeck"))
-    side, side_ids = _resolve_list((deck or {}).get("Sideboard"))
-    resolve_many(main_ids + side_ids, card_map)
-    main, _ = _resolve_list((deck or {}).get("MainDeck"))
-    side, _ = _resolve_list((deck or {}).get("Sideboard"))
-
     current_match["player_deck"] = deck_name
     current_match["format"] = fmt
-    current_match["player_decklist"] = {"main": main, "side": side}
 
-    _post_long(_format_decklist(deck_name, fmt, main, side))
+    def post():
+        main, _ = _resolve_list((deck or {}).get("MainDeck"))
+        side, _ = _resolve_list((deck or {}).get("Sideboard"))
+        if last_deck_sig != sig:
+            return  # resolved late: another deck was submitted or the match was finished meanwhile
+        current_match["player_decklist"] = {"main": main, "side": side}
+        bus.publish(DeckEvent(deck_name, fmt, main, side))
+
+    ids = [x.get("cardId") or x.get("grpId")
+           for x in ((deck or {}).get("MainDeck") or []) + ((deck or {}).get("Sideboard") or [])]
+    cached = all(str(g) in card_map and not card_map[str(g)].startswith("Unknown(") for g in ids if g is not None)
+    if prefetcher is None or cached:
+        resolve_many(ids, card_map)
+        post()
+    else:
+        # posted from the prefetch thread once every card is local; the tail loop keeps going
+        prefetcher.submit(ids, done=post)
+    if prefetcher is not None:
+        prefetcher.submit_format(fmt)
+    _warm_archetypes()
 
 # =======================
 # Handlers
@@ -429,8 +581,8 @@ def handle_top(obj: dict):
     # 0) state changes
     if "_state" in obj:
         st = obj["_state"]
-        if st.get("new") == "Playing":
-            _announce("🎮 You entered **Playing** — I’ll start reporting plays.")
+        if st.get("new"):
+            bus.publish(StateEvent(st["new"]))
         if st.get("new") == "MatchCompleted" and current_match["id"]:
             # Fallback if no structured result seen
             _finish_match("Unknown")
@@ -455,10 +607,18 @@ def handle_top(obj: dict):
         if "concede" in val.lower():
             _finish_match("Loss")
 
+def _close_stale_match():
+    """A deck submission while a match is still open means we missed its end; store it first."""
+    if current_match["id"] and not current_match["finished"]:
+        _finish_match("Unknown")
+
 def _handle_request(req: dict):
     # Full decklist
     summary = req.get("Summary") or {}
     deck = req.get("Deck") or {}
+    if deck.get("MainDeck") or deck.get("Sideboard") or summary.get("Name"):
+        # before the new deck overwrites player_deck / format / player_decklist
+        _close_stale_match()
     if deck.get("MainDeck") or deck.get("Sideboard"):
         _emit_decklist(summary, deck)
     else:
@@ -472,19 +632,27 @@ def _handle_request(req: dict):
             if current_match["player_deck"] != dn or current_match["format"] != fmt:
                 current_match["player_deck"] = dn
                 current_match["format"] = fmt
-                _announce(f"🟢 New match: **{dn}** ({fmt or '??'})")
+                bus.publish(MatchStart(dn, fmt))
+                if prefetcher is not None:
+                    prefetcher.submit_format(fmt)
+                _warm_archetypes()
 
     # Opponent name if present
     if "opponentScreenName" in req:
         if current_match["opponent"] != req.get("opponentScreenName"):
             current_match["opponent"] = req.get("opponentScreenName")
-            _announce(f"👤 Opponent: **{current_match['opponent']}**")
+            bus.publish(OpponentEvent(current_match["opponent"]))
+
+def _mark_activity():
+    global _last_activity
+    _last_activity = time.monotonic()
 
 def _walk(node):
     if isinstance(node, dict):
         # ——— MatchGameRoomStateChangedEvent (players + finalMatchResult)
         ev = node.get("matchGameRoomStateChangedEvent")
         if isinstance(ev, dict):
+            _mark_activity()
             _handle_match_room_event(ev)
 
         # ——— Old camel-case final result
@@ -494,6 +662,7 @@ def _walk(node):
         # ——— GRE events (modern)
         gre = node.get("greToClientEvent")
         if isinstance(gre, dict):
+            _mark_activity()
             msgs = gre.get("greToClientMessages") or []
             for msg in msgs:
                 # Learn your seat from any GRE message (the packet is targeted to “your” client)
@@ -504,6 +673,8 @@ def _walk(node):
 
                 gsm = msg.get("gameStateMessage") or msg.get("gameState") or {}
                 if isinstance(gsm, dict):
+                    _track_game_turn(gsm)
+                    if "players" in gsm: _track_players(gsm["players"])
                     if "zones" in gsm: _index_zones(gsm["zones"])
                     if "gameObjects" in gsm: _index_gameobjects(gsm["gameObjects"])
                     if "annotations" in gsm: _handle_annotations(gsm["annotations"])
@@ -536,6 +707,29 @@ def _walk(node):
         for it in node:
             _walk(it)
 
+def _track_game_turn(gsm: dict):
+    """
+    Keeps current game number / turn / phase (dedupe key + play records).
+    A new game (Bo3) gets fresh instanceIds, so the old index is dropped.
+    """
+    gi = gsm.get("gameInfo")
+    if isinstance(gi, dict) and gi.get("gameNumber") is not None:
+        game = gi.get("gameNumber")
+        if current_match["game"] is not None and game != current_match["game"]:
+            instance_index.clear()
+            current_match["turn"] = None
+            current_match["phase"] = None
+        current_match["game"] = game
+    ti = gsm.get("turnInfo")
+    if isinstance(ti, dict):
+        turn, phase = ti.get("turnNumber"), ti.get("phase")
+        if turn is not None and turn != current_match["turn"]:
+            current_match["turn"] = turn
+            _timeline("turn", _seat_label(ti.get("activePlayer")), value=turn)
+        if phase and phase != current_match["phase"]:
+            current_match["phase"] = phase
+            _timeline("phase", value=phase_code(phase))
+
 def _handle_match_room_event(ev: dict):
     """
     Handles MatchGameRoomStateChangedEvent (players + finalMatchResult).
@@ -544,6 +738,10 @@ def _handle_match_room_event(ev: dict):
     reserved = gri.get("reservedPlayers") or []
     match_id = gri.get("matchId") or ev.get("matchId")
 
+    # A different match while the previous one never finished → we missed its end
+    if match_id and current_match["id"] and match_id != current_match["id"] and not current_match["finished"]:
+        _finish_match("Unknown")
+
     # Infer *your* team using your seat if available
     if reserved:
         my = None
@@ -596,13 +794,11 @@ def _handle_result_old(data: dict):
     _finish_match(result)
 
 def _finish_match(result_label: str, match_id: str | None = None):
-    global opponent_cards
     if current_match["finished"]:
         return
 
     current_match["finished"] = True
 
-    global last_deck_sig
     if match_id:
         current_match["id"] = current_match["id"] or match_id
     ended_at = ts_now()
@@ -616,43 +812,108 @@ def _finish_match(result_label: str, match_id: str | None = None):
         "player_decklist": current_match.get("player_decklist"),
         "opponent": current_match.get("opponent"),
         "opponent_deck": sorted(list(opponent_cards)), 
-        "plays": current_match.get("plays", []),
+        "opponent_archetype": announced_archetype,
+        "plays": current_match["plays"].encode(),
+        "timeline": current_match["timeline"].encode(),
+        "summary": summarize(current_match["timeline"]),
     }
-
-    _announce(
-        f"📜 **Match finished!**\n"
-        f"➡️ Result: **{result_label}**\n"
-        f"🃏 You: {match_data['player_deck'] or '??'}\n"
-        f"⚔️ Opponent: {match_data['opponent'] or '??'}"
-    )
+    summary = match_data["summary"]
+    bus.publish(MatchEnd(match_data["id"], result_label, match_data["player_deck"], match_data["opponent"],
+                         summary["turns"], summary["life"]))
     save_match(match_data)
+    if archive is not None:
+        archive.flush()  # match ends on a frame boundary; nothing of it is lost on a crash
+    _reset_session()
 
-    # reset for next match
+def _reset_session():
+    """Drops all per-match state (after a finish or an expired session)."""
+    global opponent_cards, last_deck_sig, archetype_tracker, announced_archetype
     current_match.update({
         "id": None, "format": None, "player_deck": None, "opponent": None,
-        "opponent_deck": None, "player_decklist": None, "plays": [],
+        "opponent_deck": None, "player_decklist": None, "plays": PlayBuffer(),
+        "timeline": TimelineBuffer(), "life": {},
         "my_team_id": None, "my_seat": None, "opening_emitted": False,
-        "finished": False,
+        "finished": False, "game": None, "turn": None, "phase": None,
     })
     opponent_cards = set()
-    _seen_play_instances.clear()
-    _seen_plays.clear()
+    archetype_tracker = None
+    announced_archetype = None
+    _seen_transfers.clear()
     instance_index.clear()
     zone_id_name.clear()
     last_deck_sig = None
 
+def _session_active() -> bool:
+    return bool(current_match["id"] or current_match["plays"] or instance_index or len(_seen_transfers))
+
+def _expire_stale_session(now: float | None = None):
+    """
+    Watchdog: if a match saw no GRE/room traffic for SESSION_STALE_SECS
+    (crash, missed MatchCompleted), store what we have and reset so memory stays flat.
+    """
+    now = time.monotonic() if now is None else now
+    if now - _last_activity < SESSION_STALE_SECS or not _session_active():
+        return
+    print("⌛ Stale match session expired — resetting state.")
+    if current_match["id"] or current_match["plays"]:
+        _finish_match("Unknown")
+    else:
+        _reset_session()
+
+_IMPORT_MS = (time.perf_counter() - _IMPORT_T0) * 1000
+STARTUP_BUDGET_MS = 100.0
+
+def startup_check() -> bool:
+    """Prints where startup time goes (import, opening the log, first card lookup)."""
+    t = time.perf_counter()
+    try:
+        with open(LOG_PATH, "r", encoding="utf-8", errors="ignore") as f:
+            f.seek(0, 2)  # what follow() does before its first readline
+        log_note = "ready"
+    except OSError as e:
+        log_note = f"not readable ({e.__class__.__name__})"
+    open_ms = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    card_map.get("0")
+    map_ms = (time.perf_counter() - t) * 1000
+
+    heavy = [m for m in ("requests", "numpy", "zstandard", "concurrent.futures") if m in sys.modules]
+    total = _IMPORT_MS + open_ms
+    ok = total < STARTUP_BUDGET_MS
+    print(f"⏱️ import {_IMPORT_MS:.1f} ms · open {LOG_PATH} {open_ms:.1f} ms ({log_note})")
+    print(f"🗂️ card map first lookup: {map_ms:.1f} ms")
+    print(f"📦 heavy modules loaded at startup: {', '.join(heavy) or 'none'}")
+    print(f"{'✅' if ok else '⚠️'} time to first tailed line: {total:.1f} ms (budget {STARTUP_BUDGET_MS:.0f} ms)")
+    return ok
+
 # =======================
 # Main
 # =======================
 if __name__ == "__main__":
+    if "--check" in sys.argv[1:]:
+        sys.exit(0 if startup_check() else 1)
+    if ARCHIVE_DIR:
+        import log_archive
+        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+        archive_path = os.path.join(ARCHIVE_DIR, f"Player-{datetime.now():%Y%m%d-%H%M%S}.log.zst")
+        archive = log_archive.ArchiveWriter(archive_path)
+        print(f"🗜️ Archiving to {archive_path}")
     print("👀 Tailing Player.log…")
-    for line in follow(LOG_PATH):
-        try:
-            events = feed_and_parse(line)
-            for ev in events:
-                if isinstance(ev, dict):
-                    handle_top(ev)
-        except KeyboardInterrupt:
-            raise
-        except Exception as e:
-            print("⚠️ Processing error:", e)
+    try:
+        for line in follow(LOG_PATH):
+            try:
+                if archive is not None:
+                    archive.write(line)
+                _expire_stale_session()
+                for ev in feed_and_parse(line):
+                    if isinstance(ev, dict):
+                        handle_top(ev)
+            except KeyboardInterrupt:
+                raise
+            except Exception as e:
+                print("⚠️ Processing error:", e)
+    finally:
+        bus.close()  # lets queued webhook posts go out
+        if archive is not None:
+            archive.close()
@@ -0,0 +1,205 @@
+# play_log.py — compact per-match event records (plays + game timeline)
+#
+# Play record (little-endian), PLAY struct "<IBiBHB", 13 bytes:
+#   I  ts     unix seconds
+#   B  seat   0 = Player (unknown), 1 = You, 2 = Opponent
+#   i  grpId
+#   B  zone   index into ZONES
+#   H  turn   0 = unknown
+#   B  phase  index into PHASES
+#
+# Timeline record, TIMELINE struct "<IBBHBiiH", 19 bytes:
+#   I ts, B kind (KINDS), B seat, H turn, B phase, i ref, i value, H aux
+#   kind     ref                value               aux
+#   turn     -                  turn number         -        (seat = active player)
+#   phase    -                  phase code          -
+#   life     change             new life total      -
+#   damage   source grpId       amount              -        (seat = who took it)
+#   counter  card grpId         +/- amount          counter type
+#   token    token grpId        -                   -
+#
+# In matches.json a buffer is stored as {"fmt": "pev1" | "tl1", "n": <count>, "data": <base64>};
+# older matches keep the plain list of {"t", "who", "card", "zone"} dicts. iter_plays() reads both.
+#
+#   python play_log.py            # print the plays of the last match in matches.json
+#   python play_log.py <matchId>
+import base64
+import json
+import struct
+import sys
+import time
+from datetime import datetime
+from typing import Iterator, Mapping, Optional
+
+PLAY = struct.Struct("<IBiBHB")
+TIMELINE = struct.Struct("<IBBHBiiH")
+
+SEATS = ["Player", "You", "Opponent"]
+ZONES = ["other", "hand", "stack", "battlefield", "library", "graveyard", "exile", "command", "revealed", "draw"]
+PHASES = ["", "Phase_Beginning", "Phase_Main1", "Phase_Combat", "Phase_Main2", "Phase_Ending"]
+KINDS = ["turn", "phase", "life", "damage", "counter", "token"]
+_SEAT_CODE = {s: i for i, s in enumerate(SEATS)}
+_ZONE_CODE = {z: i for i, z in enumerate(ZONES)}
+_PHASE_CODE = {p: i for i, p in enumerate(PHASES)}
+_KIND_CODE = {k: i for i, k in enumerate(KINDS)}
+
+def zone_code(zone: str) -> int:
+    return _ZONE_CODE.get(zone, 0)
+
+def phase_code(phase: Optional[str]) -> int:
+    return _PHASE_CODE.get(phase or "", 0)
+
+def _i32(v) -> int:
+    return max(-0x80000000, min(0x7FFFFFFF, int(v or 0)))
+
+class RecordBuffer:
+    """Append-only bytearray of fixed-size packed records."""
+    __slots__ = ("_buf",)
+    RECORD: struct.Struct = PLAY
+    FORMAT = ""
+
+    def __init__(self, data: bytes = b""):
+        if len(data) % self.RECORD.size:
+            raise ValueError(f"truncated {self.FORMAT} buffer")
+        self._buf = bytearray(data)
+
+    def __len__(self):
+        return len(self._buf) // self.RECORD.size
+
+    def __iter__(self) -> Iterator[tuple]:
+        """Raw unpacked tuples, in field order."""
+        return self.RECORD.iter_unpack(self._buf)
+
+    def record(self, i: int) -> tuple:
+        return self.RECORD.unpack_from(self._buf, i * self.RECORD.size)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._buf)
+
+    def encode(self) -> dict:
+        """JSON-safe form for matches.json."""
+        return {"fmt": self.FORMAT, "n": len(self), "data": base64.b64encode(self._buf).decode("ascii")}
+
+    @classmethod
+    def decode(cls, obj: dict):
+        if obj.get("fmt") != cls.FORMAT:
+            raise ValueError(f"unknown record format {obj.get('fmt')!r}")
+        return cls(base64.b64decode(obj.get("data") or ""))
+
+class PlayBuffer(RecordBuffer):
+    """Plays / draws: (ts, seat, grpId, zone, turn, phase)."""
+    __slots__ = ()
+    RECORD = PLAY
+    FORMAT = "pev1"
+
+    def append(self, who: str, grp_id, zone: str, turn: Optional[int] = None,
+               phase: Optional[str] = None, ts: Optional[int] = None):
+        self._buf += PLAY.pack(int(time.time() if ts is None else ts), _SEAT_CODE.get(who, 0),
+                               _i32(grp_id), zone_code(zone), int(turn or 0) & 0xFFFF, phase_code(phase))
+
+class TimelineBuffer(RecordBuffer):
+    """Game timeline: (ts, kind, seat, turn, phase, ref, value, aux), see the table at the top."""
+    __slots__ = ()
+    RECORD = TIMELINE
+    FORMAT = "tl1"
+
+    def append(self, kind: str, who: str = "Player", ref=0, value=0, aux=0,
+               turn: Optional[int] = None, phase: Optional[str] = None, ts: Optional[int] = None):
+        self._buf += TIMELINE.pack(int(time.time() if ts is None else ts), _KIND_CODE[kind],
+                                   _SEAT_CODE.get(who, 0), int(turn or 0) & 0xFFFF, phase_code(phase),
+                                   _i32(ref), _i32(value), int(aux or 0) & 0xFFFF)
+
+def summarize(timeline: TimelineBuffer) -> dict:
+    """Turns played, last known life totals and damage taken per side — one pass, no log re-parse."""
+    turns = 0
+    life = {}
+    damage = {}
+    for _, kind, seat, _, _, _, value, _ in timeline:
+        k = KINDS[kind] if kind < len(KINDS) else ""
+        who = SEATS[seat] if seat < len(SEATS) else "Player"
+        if k == "turn":
+            turns = max(turns, value)
+        elif k == "life":
+            life[who] = value
+        elif k == "damage":
+            damage[who] = damage.get(who, 0) + value
+    return {"turns": turns, "life": life, "damage_taken": damage}
+
+class PlayView:
+    """
+    Lazy, read-only sequence of play dicts over a PlayBuffer.
+    Card names are looked up (locally, never over the network) only when a row is read.
+    """
+    def __init__(self, buf: PlayBuffer, card_map: Optional[Mapping[str, str]] = None):
+        self.buf = buf
+        self.card_map = card_map
+
+    def __len__(self):
+        return len(self.buf)
+
+    def _render(self, rec: tuple) -> dict:
+        ts, seat, grp, zone, turn, phase = rec
+        name = self.card_map.get(str(grp)) if self.card_map is not None else None
+        return {
+            "t": datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S"),
+            "who": SEATS[seat] if seat < len(SEATS) else "Player",
+            "card": name or f"Unknown({grp})",
+            "grpId": grp,
+            "zone": ZONES[zone] if zone < len(ZONES) else "other",
+            "turn": turn or None,
+            "phase": PHASES[phase] if phase < len(PHASES) else "",
+        }
+
+    def __getitem__(self, i: int) -> dict:
+        n = len(self.buf)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        return self._render(self.buf.record(i))
+
+    def __iter__(self) -> Iterator[dict]:
+        for rec in self.buf:
+            yield self._render(rec)
+
+def iter_plays(match: dict, card_map: Optional[Mapping[str, str]] = None) -> Iterator[dict]:
+    """Plays of a stored match as dicts, whichever format it was saved in."""
+    plays = match.get("plays")
+    if isinstance(plays, dict):
+        yield from PlayView(PlayBuffer.decode(plays), card_map)
+    elif isinstance(plays, list):
+        yield from plays
+
+def iter_timeline(match: dict, card_map: Optional[Mapping[str, str]] = None) -> Iterator[dict]:
+    """Timeline events of a stored match as dicts (empty for matches saved before timelines)."""
+    tl = match.get("timeline")
+    if not isinstance(tl, dict):
+        return
+    for ts, kind, seat, turn, phase, ref, value, aux in TimelineBuffer.decode(tl):
+        k = KINDS[kind] if kind < len(KINDS) else "?"
+        ev = {"t": datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S"), "kind": k,
+              "who": SEATS[seat] if seat < len(SEATS) else "Player", "turn": turn or None,
+              "phase": PHASES[phase] if phase < len(PHASES) else "", "ref": ref, "value": value, "aux": aux}
+        if k in ("damage", "counter", "token") and ref and card_map is not None:
+            ev["card"] = card_map.get(str(ref)) or f"Unknown({ref})"
+        yield ev
+
+def main(argv):
+    from card_mapper import load_card_map
+    with open("matches.json", "r", encoding="utf-8") as f:
+        hist = json.load(f)
+    if not hist:
+        raise SystemExit("📭 no matches")
+    match = next((m for m in hist if m.get("id") == argv[1]), None) if len(argv) > 1 else hist[-1]
+    if match is None:
+        raise SystemExit(f"❓ match {argv[1]} not found")
+    cmap = load_card_map()
+    print(f"📜 {match.get('id')} — {match.get('player_deck') or '??'} vs {match.get('opponent') or '??'}")
+    for p in iter_plays(match, cmap):
+        turn = f"T{p['turn']} " if p.get("turn") else ""
+        print(f"{p['t']}  {turn}{p['who']}: {p['card']} → {p['zone']}")
+    if isinstance(match.get("timeline"), dict):
+        print("⏱️", summarize(TimelineBuffer.decode(match["timeline"])))
+
+if __name__ == "__main__":
+    main(sys.argv)
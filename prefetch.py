@@ -0,0 +1,122 @@
+# prefetch.py — warm the card map before the game needs it
+#
+# When a deck is submitted the watcher queues every grpId in it, plus the opponent cards seen
+# most often in that format (from the plays stored in matches.json). One background thread
+# resolves them — snapshot first, then Scryfall with a few concurrent requests — and writes the
+# card map once per batch, so lookups during the game are local.
+#
+#   python prefetch.py Standard      # warm the cache for a format by hand
+import json
+import os
+import queue
+import sys
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, MutableMapping, Optional
+
+import card_mapper
+from play_log import PlayBuffer
+
+HISTORY_FILE = "matches.json"
+OPPONENT_TOP = 150      # most frequent opponent grpIds preloaded per format
+OPPONENT_SEAT = 2       # play_log.SEATS index of "Opponent"
+WORKERS = 4
+
+_freq_cache: Dict[tuple, List[int]] = {}
+
+def frequent_opponent_cards(fmt: Optional[str], history_path: str = HISTORY_FILE,
+                            top: int = OPPONENT_TOP) -> List[int]:
+    """grpIds the opponent played in the most matches of `fmt` (all formats if None)."""
+    try:
+        key = (history_path, os.path.getmtime(history_path), fmt, top)
+    except OSError:
+        return []
+    if key in _freq_cache:
+        return _freq_cache[key]
+    try:
+        with open(history_path, "r", encoding="utf-8") as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        return []
+    counts = Counter()
+    for m in history if isinstance(history, list) else []:
+        if fmt and m.get("format") != fmt:
+            continue
+        plays = m.get("plays")
+        if not isinstance(plays, dict):  # older matches stored names only
+            continue
+        try:
+            buf = PlayBuffer.decode(plays)
+        except ValueError:
+            continue
+        counts.update({grp for _, seat, grp, _, _, _ in buf if seat == OPPONENT_SEAT and grp})
+    _freq_cache.clear()
+    _freq_cache[key] = ids = [g for g, _ in counts.most_common(top)]
+    return ids
+
+def _known(name: Optional[str]) -> bool:
+    return bool(name) and not name.startswith("Unknown(")
+
+class Prefetcher:
+    """Background resolver; jobs run in submission order on a single daemon thread."""
+    def __init__(self, card_map: MutableMapping[str, str], workers: int = WORKERS, network: bool = True):
+        self.card_map = card_map
+        self.workers = workers
+        self.network = network
+        self._q: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, grp_ids, done: Optional[Callable[[], None]] = None):
+        """Queue grpIds (or a callable returning them, run on the worker); `done` runs after."""
+        self._q.put((grp_ids, done))
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+            self._thread.start()
+
+    def submit_format(self, fmt: Optional[str]):
+        self.submit(lambda: frequent_opponent_cards(fmt))
+
+    def submit_call(self, fn: Callable[[], None]):
+        """Runs `fn` on the worker after the jobs queued before it."""
+        self.submit((), done=fn)
+
+    def join(self):
+        """Blocks until everything queued so far is resolved."""
+        self._q.join()
+
+    def _run(self):
+        while True:
+            grp_ids, done = self._q.get()
+            try:
+                self.resolve(grp_ids() if callable(grp_ids) else grp_ids)
+            except Exception as e:
+                print("⚠️ prefetch error:", e)
+            try:
+                if done is not None:
+                    done()
+            except Exception as e:
+                print("⚠️ prefetch callback error:", e)
+            finally:
+                self._q.task_done()
+
+    def resolve(self, grp_ids: Iterable) -> int:
+        """Resolves the ids missing from the card map; one save for the whole batch."""
+        missing = {int(g) for g in grp_ids if g is not None and not _known(self.card_map.get(str(g)))}
+        if not missing:
+            return 0
+        import repair_engine  # thread pool + network stack, only once there is something to fetch
+        names = repair_engine.resolve_unknowns(missing, {}, self.workers, self.network)
+        with card_mapper.card_map_lock:
+            for gid in missing:
+                if not _known(self.card_map.get(str(gid))):
+                    # like get_card_name: remember misses so the game doesn't retry them live
+                    self.card_map[str(gid)] = names.get(gid) or f"Unknown({gid})"
+            card_mapper.save_card_map(self.card_map)
+        return len(names)
+
+if __name__ == "__main__":
+    fmt = sys.argv[1] if len(sys.argv) > 1 else None
+    ids = frequent_opponent_cards(fmt)
+    p = Prefetcher(card_mapper.load_card_map())
+    print(f"🔮 {len(ids)} frequent opponent cards for {fmt or 'all formats'}; "
+          f"{p.resolve(ids)} newly resolved")
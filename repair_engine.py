@@ -0,0 +1,152 @@
+# repair_engine.py — bulk repair of Unknown(<grpId>) entries in card_map.json and matches.json
+#
+#   python repair_engine.py                     # card map + history, overrides → snapshot → Scryfall
+#   python repair_engine.py --bulk default-cards.json --workers 8
+import argparse
+import json
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Set
+
+import card_mapper
+import scryfall_snapshot
+
+UNKNOWN_RE = re.compile(r"Unknown\((\d+)\)")
+OVERRIDES = "card_overrides.json"
+HISTORY = "matches.json"
+
+def collect_unknown_ids(paths: Iterable[str]) -> Set[int]:
+    """One streaming pass over each file; no JSON parse needed."""
+    ids = set()
+    for path in paths:
+        if not path or not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if "Unknown(" in line:
+                    ids.update(int(x) for x in UNKNOWN_RE.findall(line))
+    return ids
+
+def _load_json_map(path: str) -> Dict[str, str]:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return {str(k): str(v) for k, v in json.load(f).items() if v}
+
+def _resolved(name: Optional[str]) -> bool:
+    return bool(name) and not str(name).startswith("Unknown(")
+
+def from_snapshot(ids: Set[int]) -> Dict[int, str]:
+    """Local Scryfall snapshot (scryfall_snapshot.py) → names for `ids`."""
+    out = {}
+    for gid in ids:
+        name = scryfall_snapshot.lookup(gid)
+        if name:
+            out[gid] = name
+    return out
+
+def from_scryfall(ids: Iterable[int], workers: int = 8, rate: Optional[float] = None) -> Dict[int, str]:
+    """
+    Concurrent lookups, at most `workers` in flight. Every HTTP request — including the
+    /cards/search pages a miss falls back to — waits on card_mapper.scryfall_limiter
+    (SCRYFALL_RATE requests/s, or `rate` if given).
+    """
+    if rate is not None:
+        card_mapper.scryfall_limiter.set_rate(rate)
+
+    def one(gid):
+        return gid, card_mapper._fetch_from_scryfall(gid)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return {gid: name for gid, name in pool.map(one, sorted(ids)) if name}
+
+def resolve_unknowns(ids: Set[int], overrides: Dict[str, str], workers: int = 8,
+                     network: bool = True) -> Dict[int, str]:
+    found = {gid: overrides[str(gid)] for gid in ids if _resolved(overrides.get(str(gid)))}
+    left = ids - found.keys()
+    if left:
+        found.update(from_snapshot(left))
+        left = ids - found.keys()
+    if left and network:
+        print(f"🌐 Resolving {len(left)} IDs via Scryfall ({workers} workers) ...")
+        found.update(from_scryfall(left, workers))
+    return found
+
+def apply_to_text_file(path: str, names: Dict[int, str], backup: bool = True) -> int:
+    """Rewrites Unknown(<id>) occurrences in `path` with one atomic write. Returns the count."""
+    if not names or not os.path.exists(path):
+        return 0
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    n = 0
+
+    def sub(mm):
+        nonlocal n
+        name = names.get(int(mm.group(1)))
+        if not name:
+            return mm.group(0)
+        n += 1
+        return json.dumps(name, ensure_ascii=False)[1:-1]  # still valid inside a JSON string
+
+    text = UNKNOWN_RE.sub(sub, text)
+    if n:
+        if backup:
+            shutil.copyfile(path, path + ".bak")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    return n
+
+def apply_to_card_map(names: Dict[int, str], backup: bool = True) -> int:
+    """Fills missing / Unknown entries in the card map; one JSON write + index recompile."""
+    cmap = card_mapper.load_card_map()
+    n = 0
+    for gid, name in names.items():
+        k = str(gid)
+        if k not in cmap or not _resolved(cmap[k]):
+            cmap[k] = name
+            n += 1
+    if n:
+        if backup and os.path.exists(card_mapper.CARD_DB):
+            shutil.copyfile(card_mapper.CARD_DB, card_mapper.CARD_DB + ".bak")
+        card_mapper.save_card_map(cmap)
+    return n
+
+def repair(card_map: bool = True, history: bool = True, overrides: str = OVERRIDES,
+           bulk: Optional[str] = None, workers: int = 8, network: bool = True) -> Dict[int, str]:
+    paths = ([card_mapper.CARD_DB] if card_map else []) + ([HISTORY] if history else [])
+    ids = collect_unknown_ids(paths)
+    print(f"🔎 {len(ids)} distinct Unknown IDs in {', '.join(paths) or 'nothing'}")
+    if not ids:
+        return {}
+
+    if bulk:
+        print(f"📦 building local snapshot from {bulk} ...")
+        scryfall_snapshot.build_snapshot(bulk)
+    names = resolve_unknowns(ids, _load_json_map(overrides), workers, network)
+    print(f"✅ Resolved {len(names)} / {len(ids)}")
+    if card_map:
+        print(f"💾 {card_mapper.CARD_DB}: {apply_to_card_map(names)} entries fixed")
+    if history:
+        print(f"💾 {HISTORY}: {apply_to_text_file(HISTORY, names)} occurrences fixed")
+    still = sorted(ids - names.keys())
+    if still:
+        print(f"⚠️ Still Unknown: {still[:20]}{' …' if len(still) > 20 else ''}")
+    return names
+
+def main():
+    ap = argparse.ArgumentParser(description="Repair Unknown(...) card names in bulk")
+    ap.add_argument("--no-card-map", action="store_true")
+    ap.add_argument("--no-history", action="store_true")
+    ap.add_argument("--overrides", default=OVERRIDES)
+    ap.add_argument("--bulk", help="rebuild the local snapshot from this default_cards JSON first")
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--offline", action="store_true", help="never hit the network")
+    a = ap.parse_args()
+    repair(not a.no_card_map, not a.no_history, a.overrides, a.bulk, a.workers, not a.offline)
+
+if __name__ == "__main__":
+    main()
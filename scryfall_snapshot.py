@@ -0,0 +1,140 @@
+# scryfall_snapshot.py — local Scryfall default_cards snapshot used as an offline resolver
+#
+#   python scryfall_snapshot.py download          # fetch default_cards + build the indexes
+#   python scryfall_snapshot.py build FILE.json   # build from an already downloaded bulk file
+#   python scryfall_snapshot.py lookup 87106      # by arena_id
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, Optional
+
+from card_index import CardIndex, compile_card_index
+
+SCRYFALL_BULK = "https://api.scryfall.com/bulk-data"
+SNAPSHOT_JSON = "scryfall_default_cards.json"    # raw bulk download, kept for rebuilds
+SNAPSHOT_INDEX = "scryfall_arena.idx"            # arena_id → name, card_index layout
+PROBE_EVERY = 1.0                                # seconds between stats while there is no index
+
+_index: Optional[CardIndex] = None
+_next_probe = 0.0
+_failed_stamp = None      # (mtime, size, inode) of an index file that failed to open
+
+def download_default_cards(dest: str = SNAPSHOT_JSON) -> str:
+    """Streams the current default_cards bulk file to `dest` (atomic)."""
+    import requests
+    meta = requests.get(SCRYFALL_BULK, timeout=30)
+    meta.raise_for_status()
+    default = next((i for i in meta.json().get("data", []) if i.get("type") == "default_cards"), None)
+    if not default:
+        raise RuntimeError("default_cards not found in Scryfall bulk-data list")
+    tmp = dest + ".tmp"
+    with requests.get(default["download_uri"], stream=True, timeout=180) as r:
+        r.raise_for_status()
+        with open(tmp, "wb") as f:
+            for chunk in r.iter_content(1 << 20):
+                f.write(chunk)
+    os.replace(tmp, dest)
+    return dest
+
+def iter_bulk_cards(path: str) -> Iterator[dict]:
+    """
+    Scryfall writes bulk files as one card object per line inside a top-level array,
+    so we can stream them line by line instead of loading ~500 MB at once.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.readline()
+        if first.strip() != "[":
+            f.seek(0)
+            yield from json.load(f)
+            return
+        for line in f:
+            line = line.strip().rstrip(",")
+            if not line or line == "]":
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+def _arena_name(c: dict) -> Optional[str]:
+    name = c.get("name")
+    if name and str(c.get("collector_number", "")).startswith("A-") and not name.startswith("A-"):
+        name = "A-" + name   # rebalanced printing; card_map uses the "A-" prefix too
+    return name
+
+def build_snapshot(bulk_path: str = SNAPSHOT_JSON) -> int:
+    """Builds the arena_id → name index. Returns #arena ids."""
+    by_arena: Dict[str, str] = {}
+    for c in iter_bulk_cards(bulk_path):
+        name = _arena_name(c)
+        aid = c.get("arena_id")
+        if name and aid and str(aid) not in by_arena:
+            by_arena[str(aid)] = name
+
+    compile_card_index(by_arena, SNAPSHOT_INDEX)
+    reset()
+    return len(by_arena)
+
+def reset():
+    """Forget cached handles (after a rebuild, or to re-probe for a new snapshot)."""
+    global _index, _next_probe, _failed_stamp
+    if _index is not None:
+        _index.close()
+    _index, _next_probe, _failed_stamp = None, 0.0, None
+
+def _stamp(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def _get_index() -> Optional[CardIndex]:
+    """
+    The open snapshot index (reloaded when rebuilt on disk, like the card map), or None.
+    Without one, the file is re-probed at most every PROBE_EVERY seconds and only opened
+    again once it changed, so a snapshot downloaded while the watcher runs is picked up.
+    """
+    global _index, _next_probe, _failed_stamp
+    idx = _index
+    if idx is not None:
+        idx.maybe_reload()
+        return idx
+    now = time.monotonic()
+    if now < _next_probe:
+        return None
+    _next_probe = now + PROBE_EVERY
+    stamp = _stamp(SNAPSHOT_INDEX)
+    if stamp is None or stamp == _failed_stamp:
+        return None
+    try:
+        _index = CardIndex(SNAPSHOT_INDEX)
+    except (OSError, ValueError):
+        _failed_stamp = stamp
+    return _index
+
+def lookup(grp_id) -> Optional[str]:
+    """arena_id → name from the local snapshot, or None (no snapshot / not in it)."""
+    idx = _get_index()
+    return idx.get(grp_id) if idx is not None else None
+
+def items() -> Iterator[tuple]:
+    idx = _get_index()
+    return idx.items() if idx is not None else iter(())
+
+def main(argv):
+    cmd = argv[1] if len(argv) > 1 else "download"
+    if cmd == "download":
+        print(f"↓ downloading Scryfall default_cards → {SNAPSHOT_JSON} ...")
+        download_default_cards()
+        print(f"✅ indexed {build_snapshot()} arena ids → {SNAPSHOT_INDEX}")
+    elif cmd == "build":
+        print(f"✅ indexed {build_snapshot(argv[2] if len(argv) > 2 else SNAPSHOT_JSON)} arena ids → {SNAPSHOT_INDEX}")
+    elif cmd == "lookup" and len(argv) == 3:
+        print(lookup(argv[2]) or "❓ not in snapshot")
+    else:
+        raise SystemExit("usage: scryfall_snapshot.py [download | build FILE | lookup ID]")
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,191 @@
+# synth_log.py — deterministic fake Player.log streams (for benchmarks / replay checks)
+import argparse
+import json
+import random
+from typing import Iterator, List
+
+CARD_DB = "card_map.json"
+
+FALLBACK_IDS = [87681, 77106, 77107, 77108, 77109, 77110, 77111, 77112, 77113, 77114]
+
+ZONES = [
+    (31, "ZoneType_Hand", 1), (35, "ZoneType_Hand", 2),
+    (32, "ZoneType_Library", 1), (36, "ZoneType_Library", 2),
+    (27, "ZoneType_Stack", 0), (28, "ZoneType_Battlefield", 0),
+    (33, "ZoneType_Graveyard", 1), (37, "ZoneType_Graveyard", 2),
+    (29, "ZoneType_Exile", 0),
+]
+HAND = {1: 31, 2: 35}
+LIBRARY = {1: 32, 2: 36}
+STACK, BATTLEFIELD = 27, 28
+
+NOISE = [
+    "[UnityCrossThreadLogger]Client.SceneChange {\"fromSceneName\":\"Home\",\"toSceneName\":\"DeckBuilder\"}",
+    "[Store - Idle Unload] Unloading 3 assets",
+    "BIError: Unknown error while fetching 'Carousel'",
+    "[UnityCrossThreadLogger]Updated account. DisplayName:Player#12345, AccountID:ABCDEF, Token:Fake",
+    "Initialize engine version: 2022.3.20f1 (xyz)",
+    "(Filename: C:\\buildslave\\unity\\build\\Runtime/Export/Debug/Debug.bindings.h Line: 35)",
+    "[Accounts - Client] Successfully refreshed access token",
+    "[UnityCrossThreadLogger]STATE CHANGED {\"old\":\"Disconnected\",\"new\":\"Connecting\"}",
+]
+
+def load_grp_ids(limit: int = 400) -> List[int]:
+    """Real grpIds from card_map.json so lookups stay local; tiny fallback otherwise."""
+    try:
+        with open(CARD_DB, "r", encoding="utf-8") as f:
+            ids = sorted(int(k) for k, v in json.load(f).items()
+                         if k.isdigit() and v and not str(v).startswith("Unknown("))
+    except Exception:
+        ids = []
+    return ids[:limit] or list(FALLBACK_IDS)
+
+class _Game:
+    def __init__(self, deck: List[int], opp_deck: List[int]):
+        self.next_inst = 200
+        self.decks = {1: deck, 2: opp_deck}
+        self.hand = {1: [], 2: []}
+        self.ann_id = 1
+
+    def new_object(self, seat: int, grp: int, zone: int) -> dict:
+        self.next_inst += 1
+        return {"instanceId": self.next_inst, "grpId": grp, "type": "GameObjectType_Card",
+                "zoneId": zone, "visibility": "Visibility_Public",
+                "ownerSeatId": seat, "controllerSeatId": seat}
+
+    def transfer(self, inst: int, src: int, dst: int, category: str) -> dict:
+        self.ann_id += 1
+        return {"id": self.ann_id, "affectorId": inst, "affectedIds": [inst],
+                "type": ["AnnotationType_ZoneTransfer"],
+                "details": [{"key": "zone_src", "type": "KeyValuePairValueType_int32", "valueInt32": [src]},
+                            {"key": "zone_dest", "type": "KeyValuePairValueType_int32", "valueInt32": [dst]},
+                            {"key": "category", "type": "KeyValuePairValueType_string", "valueString": [category]}]}
+
+def _gre(seat: int, game: int, turn: int, active: int, objects: list, annotations: list, msg_id: int,
+         full: bool = False) -> dict:
+    gsm = {
+        "type": "GameStateType_Full" if full else "GameStateType_Diff",
+        "gameStateId": msg_id,
+        "gameInfo": {"matchID": "", "gameNumber": game, "stage": "GameStage_Play"},
+        "turnInfo": {"phase": "Phase_Main1", "step": "Step_Draw", "turnNumber": turn,
+                     "activePlayer": active, "priorityPlayer": active, "decisionPlayer": active},
+        "gameObjects": objects,
+        "annotations": annotations,
+    }
+    if full:
+        gsm["zones"] = [{"zoneId": z, "type": t, "visibility": "Visibility_Public", "ownerSeatId": s}
+                        for z, t, s in ZONES]
+    return {"transactionId": f"tx-{msg_id}", "requestId": msg_id, "timestamp": str(1726440000000 + msg_id),
+            "greToClientEvent": {"greToClientMessages": [
+                {"type": "GREMessageType_GameStateMessage", "systemSeatIds": [seat],
+                 "msgId": msg_id, "gameStateId": msg_id, "gameStateMessage": gsm}]}}
+
+def generate(matches: int = 5, turns: int = 10, games: int = 1, noise: float = 0.3,
+             multiline: float = 0.1, seed: int = 1234, grp_ids: List[int] | None = None) -> Iterator[str]:
+    """
+    Yields Player.log lines (with trailing newline) for `matches` matches of `games` games each.
+    `noise`     — chance of an unrelated log line between real events
+    `multiline` — chance a JSON payload is pretty-printed across several lines
+    Same arguments → same stream.
+    """
+    rnd = random.Random(seed)
+    pool = grp_ids or load_grp_ids()
+    msg_id = 0
+
+    def emit(header: str, payload: dict):
+        lines = []
+        if rnd.random() < noise:
+            lines.append(rnd.choice(NOISE))
+        if rnd.random() < multiline:
+            lines.append(header)
+            lines.extend(json.dumps(payload, indent=2).splitlines())
+        else:
+            lines.append(header + " " + json.dumps(payload, separators=(",", ":")))
+        return [ln + "\n" for ln in lines]
+
+    for m in range(matches):
+        match_id = f"{rnd.getrandbits(32):08x}-{m:04d}-4acc-ad3d-f43ecebee8e8"
+        uid = f"{rnd.getrandbits(40):010X}"
+        deck = rnd.sample(pool, min(15, len(pool)))
+        opp_deck = rnd.sample(pool, min(15, len(pool)))
+
+        request = {
+            "Summary": {"DeckId": f"deck-{m}", "Name": rnd.choice(["Mono-Green", "Orzhov Sacrifice", "Izzet Prowess"]),
+                        "Attributes": [{"name": "Format", "value": rnd.choice(["Standard", "Historic", "Alchemy"])}]},
+            "Deck": {"MainDeck": [{"cardId": g, "quantity": 4} for g in deck],
+                     "Sideboard": [{"cardId": g, "quantity": 1} for g in rnd.sample(pool, min(5, len(pool)))]},
+        }
+        yield from emit("[UnityCrossThreadLogger]==> EventSetDeckV2",
+                        {"id": f"req-{m}", "request": json.dumps(request)})
+        players = [{"userId": uid, "playerName": "Player", "systemSeatId": 1, "teamId": 1},
+                   {"userId": "OPP", "playerName": f"Opponent{m}", "systemSeatId": 2, "teamId": 2}]
+        room = {"gameRoomInfo": {"gameRoomConfig": {"reservedPlayers": players, "matchId": match_id},
+                                 "stateType": "MatchGameRoomStateType_Playing"}}
+        yield from emit("[UnityCrossThreadLogger]<== MatchGameRoomStateChangedEvent",
+                        {"matchGameRoomStateChangedEvent": room})
+        yield "[UnityCrossThreadLogger]STATE CHANGED {\"old\":\"ConnectedToMatchDoor\",\"new\":\"Playing\"}\n"
+
+        for gnum in range(1, games + 1):
+            g = _Game(deck, opp_deck)
+            objs = []
+            for seat in (1, 2):
+                for _ in range(7):
+                    o = g.new_object(seat, rnd.choice(g.decks[seat]), HAND[seat])
+                    g.hand[seat].append(o["instanceId"])
+                    objs.append(o)
+            msg_id += 1
+            yield from emit(f"[UnityCrossThreadLogger]Match to {uid}: GreToClientEvent",
+                            _gre(1, gnum, 1, 1, objs, [], msg_id, full=True))
+
+            for turn in range(1, turns + 1):
+                active = 1 if turn % 2 else 2
+                objs, anns = [], []
+                drawn = g.new_object(active, rnd.choice(g.decks[active]), HAND[active])
+                objs.append(drawn)
+                anns.append(g.transfer(drawn["instanceId"], LIBRARY[active], HAND[active], "Draw"))
+                g.hand[active].append(drawn["instanceId"])
+                for _ in range(rnd.randint(1, 3)):
+                    if not g.hand[active]:
+                        break
+                    g.hand[active].pop(rnd.randrange(len(g.hand[active])))
+                    grp = rnd.choice(g.decks[active])
+                    cast = g.new_object(active, grp, STACK)
+                    objs.append(cast)
+                    anns.append(g.transfer(cast["instanceId"], HAND[active], STACK, "CastSpell"))
+                    landed = g.new_object(active, grp, BATTLEFIELD)
+                    objs.append(landed)
+                    anns.append(g.transfer(landed["instanceId"], STACK, BATTLEFIELD, "Resolve"))
+                msg_id += 1
+                yield from emit(f"[UnityCrossThreadLogger]Match to {uid}: GreToClientEvent",
+                                _gre(1, gnum, turn, active, objs, anns, msg_id))
+
+        winner = rnd.choice([1, 2])
+        final = {"matchId": match_id, "matchCompletedReason": "MatchCompletedReasonType_Success",
+                 "resultList": [{"scope": "MatchScope_Game", "result": "ResultType_WinLoss", "winningTeamId": winner},
+                                {"scope": "MatchScope_Match", "result": "ResultType_WinLoss", "winningTeamId": winner}]}
+        room = {"gameRoomInfo": {"gameRoomConfig": {"reservedPlayers": players, "matchId": match_id},
+                                 "stateType": "MatchGameRoomStateType_MatchCompleted",
+                                 "finalMatchResult": final}}
+        yield from emit("[UnityCrossThreadLogger]<== MatchGameRoomStateChangedEvent",
+                        {"matchGameRoomStateChangedEvent": room})
+        yield "[UnityCrossThreadLogger]STATE CHANGED {\"old\":\"Playing\",\"new\":\"MatchCompleted\"}\n"
+
+def main():
+    ap = argparse.ArgumentParser(description="Write a synthetic MTGA Player.log")
+    ap.add_argument("out", help="output path")
+    ap.add_argument("--matches", type=int, default=5)
+    ap.add_argument("--turns", type=int, default=10)
+    ap.add_argument("--games", type=int, default=1)
+    ap.add_argument("--noise", type=float, default=0.3)
+    ap.add_argument("--multiline", type=float, default=0.1)
+    ap.add_argument("--seed", type=int, default=1234)
+    a = ap.parse_args()
+    n = 0
+    with open(a.out, "w", encoding="utf-8") as f:
+        for line in generate(a.matches, a.turns, a.games, a.noise, a.multiline, a.seed):
+            f.write(line)
+            n += 1
+    print(f"✅ wrote {n} lines to {a.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+# the project is a flat set of scripts; make them importable from tests/
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+import analytics
+
+def _m(day, deck, fmt, result, cards):
+    return {"time": f"2025-09-0{day} 10:00:00", "player_deck": deck, "format": fmt, "result": result,
+            "opponent": "Bob", "opponent_deck": cards}
+
+# stored out of time order on purpose; match 5 is undecided and ignored by every rate
+MATCHES = [
+    _m(7, "Elves", "Standard", "Win", ["B"]),
+    _m(1, "Elves", "Standard", "Win", ["A", "B"]),
+    _m(2, "Elves", "Standard", "Loss", ["A", "C"]),
+    _m(3, "Burn", "Historic", "Win", ["B"]),
+    _m(4, "Elves", "Standard", "Loss", ["A", "Unknown(5)"]),
+    _m(5, "Burn", "Historic", "Unknown", ["A"]),
+    _m(6, "Burn", "Standard", "Loss", ["A", "B", "C"]),
+]
+
+@pytest.fixture
+def hist():
+    return analytics.History(MATCHES)
+
+def test_wilson_known_intervals():
+    lo, hi = analytics.wilson(np.array([0, 5, 10]), np.array([0, 10, 10]))
+    assert (lo[0], hi[0]) == (0.0, 1.0)   # no games: no information
+    assert lo[1] == pytest.approx(0.2366, abs=1e-4) and hi[1] == pytest.approx(0.7634, abs=1e-4)
+    assert lo[2] == pytest.approx(0.7225, abs=1e-4) and hi[2] == pytest.approx(1.0)
+
+def test_winrates_grouped_by_deck_and_format(hist):
+    rows = analytics.winrates(hist, "deck")
+    assert [(r["name"], r["games"], r["wins"], r["losses"], r["winrate"]) for r in rows] == [
+        ("Elves", 4, 2, 2, 0.5), ("Burn", 2, 1, 1, 0.5)]
+    assert rows[0]["ci"][0] < 0.5 < rows[0]["ci"][1]
+    assert [(r["name"], r["games"], r["wins"]) for r in analytics.winrates(hist, "format")] == [
+        ("Standard", 5, 2), ("Historic", 1, 1)]
+    since = hist.mask(since=np.datetime64("2025-09-04T00:00:00"))
+    assert [(r["name"], r["games"], r["wins"]) for r in analytics.winrates(hist, "deck", since)] == [
+        ("Elves", 2, 1), ("Burn", 1, 0)]
+
+def test_card_deltas(hist):
+    rows = analytics.card_deltas(hist, min_games=1)
+    assert [(r["card"], r["games"], r["winrate_with"], r["winrate_without"], r["delta"]) for r in rows] == [
+        ("A", 4, 0.25, 1.0, -0.75),
+        ("C", 2, 0.0, 0.75, -0.75),
+        ("B", 4, 0.75, 0.0, 0.75),
+    ]
+    assert [r["card"] for r in analytics.card_deltas(hist, min_games=3)] == ["A", "B"]
+    assert analytics.card_deltas(hist, hist.mask(deck="Nope")) == []
+
+def test_rolling_window_in_time_order(hist):
+    rows = analytics.rolling(hist, window=2)
+    assert [r["time"][:10] for r in rows] == [f"2025-09-0{d}" for d in (1, 2, 3, 4, 6, 7)]
+    assert [(r["winrate"], r["games"]) for r in rows] == [(1.0, 1), (0.5, 2), (0.5, 2), (0.5, 2), (0.0, 2), (0.5, 2)]
+    elves = analytics.rolling(hist, hist.mask(deck="Elves"), window=3)
+    assert [r["winrate"] for r in elves] == pytest.approx([1.0, 0.5, 1 / 3, 1 / 3])  # W L L W
+
+def test_cli_json(tmp_path, capsys):
+    path = tmp_path / "matches.json"
+    path.write_text(json.dumps(MATCHES), encoding="utf-8")
+    analytics.main(["winrate", "--by", "format", "--json", "--history", str(path)])
+    assert [(r["name"], r["games"]) for r in json.loads(capsys.readouterr().out)] == [("Standard", 5), ("Historic", 1)]
+
+def test_parse_since_forms():
+    assert analytics.parse_since(None) is None
+    assert analytics.parse_since("2025-09-01") == np.datetime64("2025-09-01T00:00:00")
+    assert analytics.parse_since("30d") < analytics.parse_since("1d")
+
+def test_bad_since_is_a_usage_error(capsys):
+    with pytest.raises(ValueError, match="bad date"):
+        analytics.parse_since("last tuesday")
+    with pytest.raises(SystemExit) as exc:
+        analytics.main(["winrate", "--since", "2025-13-01"])
+    assert exc.value.code == 2
+    assert "--since: bad date '2025-13-01'" in capsys.readouterr().err
@@ -0,0 +1,71 @@
+import json
+import threading
+
+import archetypes
+import mtga_log_watcher as w
+from prefetch import Prefetcher
+
+DECKS = {
+    "Elves": ["Llanowar Elves", "Elvish Mystic", "Jaspera Sentinel", "Forest"],
+    "Burn": ["Lightning Strike", "Play with Fire", "Kumano Faces Kakkazan", "Mountain"],
+}
+
+def _history(tmp_path):
+    path = tmp_path / "matches.json"
+    path.write_text(json.dumps([{"player_deck": name, "player_decklist": {"main": [[4, c] for c in cards]}}
+                                for name, cards in DECKS.items()]), encoding="utf-8")
+    return str(path)
+
+def test_load_index_caches_and_cached_index_never_builds(tmp_path, monkeypatch):
+    monkeypatch.setattr(archetypes, "_cache", None)
+    hist = _history(tmp_path)
+    assert archetypes.cached_index() is None
+    idx = archetypes.load_index(hist, str(tmp_path / "none.json"))
+    assert archetypes.load_index(hist, str(tmp_path / "none.json")) is idx
+    assert archetypes.cached_index() is idx
+    assert archetypes.classify(["Forest", "Elvish Mystic"], idx)[0] == "Elves"
+
+def test_exact_reference_list_scores_one_in_a_large_corpus():
+    decks = {f"Deck {d}": {f"Card {d}-{i}" for i in range(20)} for d in range(50)}
+    decks["Deck 0"] |= {"Forest", "Llanowar Elves"}   # shared staples get a lower idf
+    decks["Deck 1"] |= {"Forest", "Llanowar Elves"}
+    idx = archetypes.ArchetypeIndex(decks)
+    t = archetypes.ArchetypeTracker(idx)
+    for c in sorted(decks["Deck 0"]):
+        t.add(c)
+    name, score = t.confident_guess()
+    assert name == "Deck 0"
+    assert abs(score - 1.0) < 1e-9
+
+    partial = archetypes.ArchetypeTracker(idx)
+    for c in sorted(decks["Deck 7"])[:5]:
+        partial.add(c)
+    name, score = partial.guess()
+    assert name == "Deck 7"
+    assert abs(score - (5 / 20) ** 0.5) < 1e-9   # uniform idf: |q∩a| / sqrt(|q|·|a|)
+
+def test_opponent_cards_never_build_the_index_on_the_tail_thread(tmp_path, monkeypatch):
+    monkeypatch.setattr(archetypes, "_cache", None)
+    monkeypatch.setattr(w, "HISTORY_FILE", _history(tmp_path))
+    monkeypatch.setattr(w, "ANNOUNCE_ARCHETYPE", True)
+    prefetcher = Prefetcher({}, network=False)
+    monkeypatch.setattr(w, "prefetcher", prefetcher)
+    built_on = []
+    real_load = archetypes.load_index
+    def load_index(*a):
+        built_on.append(threading.current_thread().name)
+        return real_load(*a)
+    monkeypatch.setattr(archetypes, "load_index", load_index)
+    published = []
+    monkeypatch.setattr(w.bus, "publish", published.append)
+
+    w._reset_session()
+    try:
+        w._note_opponent_card("Mountain")        # no index yet: queues a build, no guess
+        prefetcher.join()
+        w._note_opponent_card("Lightning Strike")
+        w._note_opponent_card("Play with Fire")  # the first card is replayed into the tracker
+        assert built_on == ["prefetch"]
+        assert [(e.name, e.cards) for e in published] == [("Burn", 3)]
+    finally:
+        w._reset_session()
@@ -0,0 +1,22 @@
+import json
+import os
+
+import bench_parse
+
+BASELINE = {"lines_per_s": 40000.0, "events_per_s": 3000.0, "peak_rss_mb": 20.0,
+            "peak_traced_bytes_per_event": 800.0, "alloc_blocks_per_event": 2.0}
+
+def test_rates_are_only_compared_on_request():
+    slow = dict(BASELINE, lines_per_s=20000.0, peak_rss_mb=40.0)
+    assert bench_parse.compare(slow, BASELINE, 0.2) == []
+    assert [b.split(":")[0] for b in bench_parse.compare(slow, BASELINE, 0.2, rates=True)] == [
+        "lines_per_s", "peak_rss_mb"]
+
+def test_memory_metrics_are_always_compared():
+    heavy = dict(BASELINE, peak_traced_bytes_per_event=1000.0, alloc_blocks_per_event=2.2)
+    assert [b.split(":")[0] for b in bench_parse.compare(heavy, BASELINE, 0.2)] == ["peak_traced_bytes_per_event"]
+
+def test_committed_baseline_has_every_metric():
+    path = os.path.join(os.path.dirname(bench_parse.__file__), bench_parse.BASELINE_FILE)
+    with open(path, "r", encoding="utf-8") as f:
+        assert set(bench_parse.METRICS) <= set(json.load(f))
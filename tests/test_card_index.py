@@ -0,0 +1,85 @@
+import os
+
+from card_index import HEADER, MAGIC, RECORD, VERSION, CardIndex, CardMap, compile_card_index, read_generation
+
+CARDS = {"67890": "Llanowar Elves", "12": "Forest", "99999": "Æther Vial", "bad": "skipped", "5": ""}
+
+def test_layout(tmp_path):
+    path = str(tmp_path / "cards.idx")
+    assert compile_card_index(CARDS, path) == 1
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, _, gen, count, rec_off, str_off, str_len, _ = HEADER.unpack_from(data, 0)
+    assert (magic, version, gen, count, rec_off) == (MAGIC, VERSION, 1, 3, HEADER.size)
+    assert str_off == HEADER.size + 3 * RECORD.size and len(data) == str_off + str_len
+    ids = [RECORD.unpack_from(data, rec_off + i * RECORD.size)[0] for i in range(count)]
+    assert ids == [12, 67890, 99999]
+    gid, off, ln = RECORD.unpack_from(data, rec_off + 2 * RECORD.size)
+    assert data[str_off + off:str_off + off + ln].decode("utf-8") == "Æther Vial"
+
+def test_round_trip_and_generation_bump(tmp_path):
+    path = str(tmp_path / "cards.idx")
+    compile_card_index(CARDS, path)
+    idx = CardIndex(path, check_every=0)
+    assert idx.generation == 1 and len(idx) == 3
+    assert idx.get(67890) == "Llanowar Elves"
+    assert idx.get("12") == "Forest"
+    assert idx.get(13) is None and idx.get("bad", "?") == "?"
+
+    # the open reader holds no handle/mapping, so the writer can replace the file under it
+    assert compile_card_index(dict(CARDS, **{"13": "Island"}), path) == 2
+    assert read_generation(path) == 2
+    os.utime(path, ns=(1, 1))  # make sure the stat stamp differs even on coarse-mtime filesystems
+    assert idx.get(13) == "Island"
+    assert idx.generation == 2 and not os.path.exists(path + ".tmp")
+
+def test_card_map_overlay(tmp_path):
+    path = str(tmp_path / "cards.idx")
+    compile_card_index(CARDS, path)
+    cmap = CardMap(CardIndex(path))
+    cmap["13"] = "Island"
+    del cmap["12"]
+    assert "12" not in cmap and cmap["13"] == "Island"
+    assert cmap.copy() == {"67890": "Llanowar Elves", "99999": "Æther Vial", "13": "Island"}
+
+def test_concurrent_reload_never_mixes_generations(tmp_path):
+    # the watcher's tail loop and prefetch.py's thread read while saves recompile the index
+    import sys
+    import threading
+    import time
+
+    path = str(tmp_path / "cards.idx")
+    a = {str(i): f"A{i}" for i in range(1, 400)}
+    b = {str(i): f"Bbbbbbb{i}" for i in range(1, 400, 2)}
+    compile_card_index(a, path)
+    idx = CardIndex(path, check_every=0)
+    errors = []
+    stop = time.monotonic() + 1
+
+    def read():
+        while time.monotonic() < stop:
+            for i in (1, 101, 201, 399):
+                try:
+                    name = idx.get(i)
+                except Exception as e:  # pragma: no cover - the failure being tested for
+                    errors.append(repr(e))
+                    return
+                if name not in (None, f"A{i}", f"Bbbbbbb{i}"):
+                    errors.append(f"{i} -> {name!r}")
+
+    old = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        readers = [threading.Thread(target=read) for _ in range(2)]
+        for t in readers:
+            t.start()
+        n = 0
+        while time.monotonic() < stop:
+            compile_card_index(b if n % 2 else a, path)
+            os.utime(path, ns=(n, n))
+            n += 1
+        for t in readers:
+            t.join()
+    finally:
+        sys.setswitchinterval(old)
+    assert not errors, errors[:5]
@@ -0,0 +1,72 @@
+import json
+import threading
+
+import pytest
+
+import events
+from events import DeckEvent, DrawEvent, MatchEnd, StateEvent
+
+def _sinks(spec, webhook_url=""):
+    return [(type(s).__name__, s.kinds, s.who) for s in events.build_bus(spec, webhook_url).sinks]
+
+def test_documented_sink_specs():
+    assert _sinks("") == [("StdoutSink", None, None)]
+    assert _sinks("", "https://hook") == [("StdoutSink", None, None), ("DiscordSink", None, None)]
+    assert _sinks("discord?kinds=deck,hand,match_end", "https://hook") == [
+        ("DiscordSink", {"deck", "hand", "match_end"}, None)]
+    assert _sinks("stdout?who=Opponent") == [("StdoutSink", None, "Opponent")]
+    assert _sinks("stdout?kinds=deck,hand,file:events.jsonl, socket:127.0.0.1:9999?kinds=play&who=You") == [
+        ("StdoutSink", {"deck", "hand"}, None),
+        ("FileSink", None, None),
+        ("SocketSink", {"play"}, "You"),
+    ]
+    sock = events.make_sink("socket:127.0.0.1:9999")
+    assert sock.addr == ("127.0.0.1", 9999)
+
+@pytest.mark.parametrize("spec", ["stdout,hand", "stdout?color=red", "discord"])
+def test_bad_sink_specs(spec):
+    with pytest.raises(ValueError):
+        events.build_bus(spec)
+
+def test_filters_and_file_sink(tmp_path):
+    path = tmp_path / "ev.jsonl"
+    bus = events.build_bus(f"file:{path}?kinds=draw,match_end&who=Opponent")
+    assert bus.wants("draw") and not bus.wants("play")
+    bus.publish(DrawEvent("You", "Forest", 87681, ts=1.0))
+    bus.publish(DrawEvent("Opponent", "Mountain", 87682, turn=2, ts=2.0))
+    bus.publish(StateEvent("Playing", ts=3.0))
+    bus.publish(MatchEnd("m1", "Win", "Elves", "Bob", ts=4.0))  # no `who`: passes the who filter
+    bus.join()
+    bus.close()
+    rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert rows == [
+        {"kind": "draw", "ts": 2.0, "who": "Opponent", "card": "Mountain", "grp_id": 87682, "turn": 2},
+        {"kind": "match_end", "ts": 4.0, "match_id": "m1", "result": "Win", "deck": "Elves",
+         "opponent": "Bob", "turns": 0, "life": {}},
+    ]
+
+def test_discord_sink_splits_long_texts(monkeypatch):
+    sink = events.DiscordSink("https://hook", chunk=40)
+    posts = []
+    monkeypatch.setattr(sink, "_post", posts.append)
+    sink.emit(DeckEvent("Elves", "Standard", [(4, f"Card number {i}") for i in range(6)], []))
+    assert all(len(p) <= 40 for p in posts)
+    assert "".join(posts) == DeckEvent("Elves", "Standard", [(4, f"Card number {i}") for i in range(6)], []).text()
+
+def test_sink_survives_a_failing_error_report(monkeypatch):
+    class Broken(events.Sink):
+        def emit(self, ev):
+            print(ev.text())
+
+    def broken_print(*a, **k):
+        raise BrokenPipeError(32, "Broken pipe")
+    monkeypatch.setattr("builtins.print", broken_print)
+    sink = Broken()
+    for _ in range(3):
+        sink.put(StateEvent("Playing"))
+    joined = threading.Thread(target=sink.join, daemon=True)
+    joined.start()
+    joined.join(timeout=5)
+    assert not joined.is_alive()
+    assert sink._thread.is_alive()
+    sink.close()
@@ -0,0 +1,113 @@
+import os
+import struct
+
+import pytest
+
+import log_archive
+import synth_log
+from play_log import PLAY, TIMELINE, PlayBuffer, PlayView, TimelineBuffer, summarize
+
+GRP_IDS = list(synth_log.FALLBACK_IDS)
+
+def _synth(seed):
+    return list(synth_log.generate(matches=2, turns=4, seed=seed, grp_ids=GRP_IDS))
+
+def test_synth_stream_is_deterministic():
+    a, b = _synth(7), _synth(7)
+    assert a == b
+    assert a != _synth(8)
+    assert all(line.endswith("\n") for line in a)
+    assert sum("MatchGameRoomStateType_MatchCompleted" in line for line in a) == 2
+
+def test_play_buffer_round_trip():
+    buf = PlayBuffer()
+    buf.append("You", 87681, "battlefield", turn=3, phase="Phase_Main1", ts=1700000000)
+    buf.append("Opponent", 77106, "stack", ts=1700000001)
+    buf.append("Opponent", 2 ** 40, "nowhere", ts=1700000002)  # clamped / unknown zone
+    assert len(buf.to_bytes()) == 3 * PLAY.size == 39
+
+    back = PlayBuffer.decode(buf.encode())
+    assert back.encode() == {"fmt": "pev1", "n": 3, "data": buf.encode()["data"]}
+    assert list(back) == [
+        (1700000000, 1, 87681, 3, 3, 2),
+        (1700000001, 2, 77106, 2, 0, 0),
+        (1700000002, 2, 0x7FFFFFFF, 0, 0, 0),
+    ]
+    row = PlayView(back, {"87681": "Forest"})[0]
+    assert (row["who"], row["card"], row["zone"], row["turn"]) == ("You", "Forest", "battlefield", 3)
+    assert PlayView(back, {})[-1]["card"] == f"Unknown({0x7FFFFFFF})"
+
+def test_record_format_checks():
+    with pytest.raises(ValueError):
+        PlayBuffer(b"\0" * (PLAY.size - 1))
+    with pytest.raises(ValueError):
+        TimelineBuffer.decode(PlayBuffer().encode())
+
+def test_timeline_round_trip_and_summary():
+    tl = TimelineBuffer()
+    tl.append("turn", "You", value=1, turn=1, ts=1)
+    tl.append("life", "Opponent", ref=-3, value=17, turn=1, ts=2)
+    tl.append("damage", "Opponent", ref=87681, value=3, turn=1, ts=2)
+    tl.append("turn", "Opponent", value=2, turn=2, ts=3)
+    tl.append("damage", "Opponent", ref=87681, value=2, turn=3, ts=4)
+    assert len(tl.to_bytes()) == 5 * TIMELINE.size
+    back = TimelineBuffer.decode(tl.encode())
+    assert back.record(1) == (2, 2, 2, 1, 0, -3, 17, 0)
+    assert summarize(back) == {"turns": 2, "life": {"Opponent": 17}, "damage_taken": {"Opponent": 5}}
+
+# ---- log_archive (needs zstandard) ----
+
+def _log_bytes():
+    return "".join(_synth(3)).encode("utf-8")
+
+def _read_all(path):
+    with log_archive.open_archive(path) as f:
+        return f.read()
+
+def test_seek_table_layout_and_random_access(tmp_path):
+    pytest.importorskip("zstandard")
+    data = _log_bytes()
+    src = tmp_path / "Player.log"
+    src.write_bytes(data)
+    dst = str(tmp_path / "Player.log.zst")
+    frames = log_archive.pack(str(src), dst, frame_size=4096)
+
+    assert [d for _, d in frames[:-1]] == [4096] * (len(frames) - 1)
+    assert sum(d for _, d in frames) == len(data)
+    with open(dst, "rb") as f:
+        raw = f.read()
+        assert log_archive._read_seek_table(f, len(raw)) == frames
+    count, desc, magic = log_archive.FOOTER.unpack(raw[-log_archive.FOOTER.size:])
+    assert (count, desc, magic) == (len(frames), 0, log_archive.SEEKABLE_MAGIC)
+    table = struct.pack("<II", log_archive.SKIPPABLE_MAGIC,
+                        len(frames) * log_archive.ENTRY.size + log_archive.FOOTER.size)
+    assert raw[sum(c for c, _ in frames):].startswith(table)
+
+    assert _read_all(dst) == data
+    with log_archive.open_archive(dst) as f:
+        for off in (0, 4095, 4096, 10000, len(data) - 5):
+            f.seek(off)
+            assert f.read(64) == data[off:off + 64]
+
+def test_torn_archive_is_walked_and_repaired(tmp_path):
+    pytest.importorskip("zstandard")
+    data = _log_bytes()
+    path = str(tmp_path / "torn.zst")
+    w = log_archive.ArchiveWriter(path, frame_size=4096)
+    w.write(data)
+    w.flush()  # killed before close(): no seek table
+    w._f.close()
+    frames = w.frames
+    with open(path, "ab") as f:
+        f.write(log_archive.ZSTD_MAGIC + b"\x00" * 5)  # half-written next frame
+
+    with open(path, "rb") as f:
+        assert log_archive._read_seek_table(f, os.path.getsize(path)) is None
+        assert log_archive._walk_frames(f) == (frames, sum(c for c, _ in frames))
+    assert _read_all(path) == data
+
+    assert log_archive.repair(path) == len(frames)
+    assert log_archive.repair(path) == -1
+    with open(path, "rb") as f:
+        assert log_archive._read_seek_table(f, os.path.getsize(path)) == frames
+    assert _read_all(path) == data
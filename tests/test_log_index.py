@@ -0,0 +1,41 @@
+import pytest
+
+import log_index
+import synth_log
+
+def _write_log(tmp_path, drop_end_of=None, multiline=0.0):
+    lines = list(synth_log.generate(matches=3, turns=3, multiline=multiline, seed=11,
+                                    grp_ids=list(synth_log.FALLBACK_IDS)))
+    if drop_end_of is not None:  # watcher killed / log cut: no final room event, no MatchCompleted
+        ends = [i for i, ln in enumerate(lines) if "MatchCompleted" in ln]
+        first_end = [i for i in ends if lines[i].startswith("[UnityCrossThreadLogger]<==")][drop_end_of]
+        del lines[first_end:first_end + 2]
+    path = tmp_path / "Player.log"
+    path.write_text("".join(lines), encoding="utf-8")
+    return str(path)
+
+def _ranges(path):
+    idx = log_index.scan(path)
+    return idx, [log_index.extract(path, m) for m in idx["matches"]]
+
+@pytest.mark.parametrize("multiline", [0.0, 1.0])
+def test_each_match_range_holds_its_own_deck_submission(tmp_path, multiline):
+    path = _write_log(tmp_path, multiline=multiline)
+    idx, raw = _ranges(path)
+    assert len(idx["matches"]) == 3
+    for m, data in zip(idx["matches"], raw):
+        assert data.count(b"DeckId") == 1  # its own deck submission, first object in the range
+        assert data.index(b"DeckId") < data.index(b"matchGameRoomStateChangedEvent")
+        assert data.rstrip().endswith(b'"new":"MatchCompleted"}')
+        assert m["match_id"].encode() in data
+        assert m["result"] in ("Win", "Loss")
+    assert [d["offset"] for d in idx["decks"]] == [m["start"] for m in idx["matches"]]
+
+def test_missed_end_closes_at_the_next_deck_submission(tmp_path):
+    path = _write_log(tmp_path, drop_end_of=0)
+    idx, raw = _ranges(path)
+    first, second = idx["matches"][:2]
+    assert first["result"] is None
+    assert first["end"] == second["start"] == idx["decks"][1]["offset"]
+    assert [data.count(b"DeckId") for data in raw] == [1, 1, 1]
+    assert raw[1].startswith(b"[UnityCrossThreadLogger]==> EventSetDeckV2")
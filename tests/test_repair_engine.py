@@ -0,0 +1,38 @@
+import time
+
+import card_mapper
+import repair_engine
+
+class _Resp:
+    def __init__(self, ok, js=None):
+        self.ok = ok
+        self._js = js or {}
+
+    def json(self):
+        return self._js
+
+class _FakeScryfall:
+    """/cards/arena misses; /cards/search answers with two pages, the match on the second."""
+    def __init__(self):
+        self.times = []
+
+    def get(self, url, params=None, timeout=None):
+        self.times.append(time.monotonic())
+        if "/cards/arena/" in url:
+            return _Resp(False)
+        if params is not None:
+            gid = params["q"].split()[0].split(":")[1]
+            return _Resp(True, {"data": [], "has_more": True, "next_page": f"page2/{gid}"})
+        gid = url.rsplit("/", 1)[1]
+        return _Resp(True, {"data": [{"arena_id": int(gid), "name": f"Card {gid}"}], "has_more": False})
+
+def test_every_scryfall_request_is_rate_limited(monkeypatch):
+    fake = _FakeScryfall()
+    monkeypatch.setattr(card_mapper, "_session", fake)
+    monkeypatch.setattr(card_mapper, "scryfall_limiter", card_mapper._RateLimiter(100.0))
+
+    names = repair_engine.from_scryfall(range(1, 9), workers=8)
+    assert names == {gid: f"Card {gid}" for gid in range(1, 9)}
+    assert len(fake.times) == 8 * 3  # arena miss + two search pages per id
+    span = max(fake.times) - min(fake.times)
+    assert span >= (len(fake.times) - 1) / 100.0 * 0.9
@@ -0,0 +1,45 @@
+import json
+import os
+
+import pytest
+
+import scryfall_snapshot as snap
+from card_index import compile_card_index
+
+@pytest.fixture
+def snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(snap, "SNAPSHOT_INDEX", str(tmp_path / "arena.idx"))
+    monkeypatch.setattr(snap, "PROBE_EVERY", 0.0)
+    snap.reset()
+    yield snap
+    snap.reset()
+
+def test_build_from_streamed_bulk_file(snapshot, tmp_path):
+    cards = [
+        {"name": "Forest", "arena_id": 87681, "collector_number": "280", "set": "dmu"},
+        {"name": "Forest", "arena_id": 87681, "collector_number": "281", "set": "dmu"},  # first printing wins
+        {"name": "Inspiring Vantage", "arena_id": 77106, "collector_number": "A-246", "set": "ymid"},
+        {"name": "No Arena Printing", "collector_number": "1", "set": "lea"},
+    ]
+    bulk = tmp_path / "default_cards.json"
+    bulk.write_text("[\n" + ",\n".join(json.dumps(c) for c in cards) + "\n]\n", encoding="utf-8")
+    assert snapshot.build_snapshot(str(bulk)) == 2
+    assert snapshot.lookup(87681) == "Forest"
+    assert snapshot.lookup("77106") == "A-Inspiring Vantage"
+    assert snapshot.lookup(1) is None
+
+def test_missing_snapshot_is_reprobed_and_reloaded(snapshot):
+    assert snapshot.lookup(87681) is None          # no file yet
+    with open(snapshot.SNAPSHOT_INDEX, "wb") as f:
+        f.write(b"not an index")
+    assert snapshot.lookup(87681) is None          # bad file: not reopened until it changes
+    assert snapshot._failed_stamp is not None
+
+    compile_card_index({"87681": "Forest"}, snapshot.SNAPSHOT_INDEX)  # downloaded while running
+    assert snapshot.lookup(87681) == "Forest"
+
+    compile_card_index({"87681": "Forest", "77106": "Plains"}, snapshot.SNAPSHOT_INDEX)
+    st = os.stat(snapshot.SNAPSHOT_INDEX)
+    os.utime(snapshot.SNAPSHOT_INDEX, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    snapshot._index._next_check = 0.0
+    assert snapshot.lookup(77106) == "Plains"
@@ -0,0 +1,50 @@
+import mtga_log_watcher as w
+
+def _deck(name, ids):
+    summary = {"Name": name, "Attributes": [{"name": "Format", "value": "Standard"}]}
+    return summary, {"MainDeck": [{"cardId": g, "quantity": 4} for g in ids]}
+
+def current_decklist():
+    return w.current_match["player_decklist"]
+
+class _HeldPrefetcher:
+    """Keeps the callbacks so the test decides when the 'network' batch finishes."""
+    def __init__(self):
+        self.done = []
+
+    def submit(self, grp_ids, done=None):
+        if done is not None:
+            self.done.append(done)
+
+    def submit_format(self, fmt):
+        pass
+
+    def submit_call(self, fn):
+        pass
+
+def test_late_decklist_never_overwrites_a_newer_deck(monkeypatch):
+    card_map = {}
+    held = _HeldPrefetcher()
+    published = []
+    monkeypatch.setattr(w, "card_map", card_map)
+    monkeypatch.setattr(w, "prefetcher", held)
+    monkeypatch.setattr(w.bus, "publish", published.append)
+    w._reset_session()
+    try:
+        w._emit_decklist(*_deck("Elves", [1, 2]))
+        w._emit_decklist(*_deck("Burn", [3, 4]))
+        card_map.update({"1": "Llanowar Elves", "2": "Forest", "3": "Shock", "4": "Mountain"})
+
+        held.done[1]()   # the newer deck resolves first
+        held.done[0]()   # the stale one must not overwrite it nor be posted after it
+        assert [e.name for e in published] == ["Burn"]
+        assert current_decklist() == {"main": [(4, "Mountain"), (4, "Shock")], "side": []}
+
+        w._emit_decklist(*_deck("Mono-Blue", [5]))
+        w._reset_session()  # match finished / expired before the batch resolved
+        card_map["5"] = "Island"
+        held.done[2]()
+        assert [e.name for e in published] == ["Burn"]
+        assert current_decklist() is None
+    finally:
+        w._reset_session()